@@ -1,4 +1,4 @@
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 from config import Config
 from extensions import jwt, cors
 from routes.auth_routes import auth_bp
@@ -7,36 +7,162 @@ from routes.contact_routes import contact_bp
 from routes.user_routes import user_bp
 from datetime import datetime
 from routes.ai_routes import ai_bp
+from pymongo.errors import PyMongoError
+from indexes import ensure_indexes, missing_required_indexes
+from counters import migrate_events
+from helpers.cache import get_response_cache
+from helpers.serializer import MongoJSONProvider
+from helpers.passwords import get_password_hasher
+from helpers.identity import get_user_cache, register_user_loader
+from helpers.revocation import get_revocation_list, register_revocation_loaders
+from helpers.singleflight import get_single_flight
+from helpers.write_behind import get_contact_writer
+from helpers.jobs import get_job_runner
+from helpers.query_tracker import register_query_tracking
+from helpers.deadline import register_query_deadlines
+from helpers.concurrency import register_load_shedding
+from helpers.health import get_readiness_check, pool_monitor
+from helpers.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, get_request_metrics, register_request_metrics
+import tasks  # noqa: F401 - registers the background job handlers
 
 
-app = Flask(__name__)
-app.config.from_object(Config)
+def create_app(config=Config):
+    app = Flask(__name__)
+    app.config.from_object(config)
+    # Encode ObjectId/datetime directly so routes can return raw documents
+    app.json = MongoJSONProvider(app)
+    # Time every request, so this goes before any other request hook
+    register_request_metrics(app)
+    # Shed excess load before any other work is done for the request
+    load_shedder = register_load_shedding(app)
 
-# Initialize extensions
-jwt.init_app(app)
-cors.init_app(app, resources={r"/api/*": {"origins": "http://localhost:5173"}})
+    # Flask only enforces MAX_CONTENT_LENGTH when a route reads the body, and
+    # the routes' catch-all except would turn that 413 into a 500
+    @app.before_request
+    def limit_body_size():
+        limit = app.config['MAX_CONTENT_LENGTH']
+        if limit and (request.content_length or 0) > limit:
+            return jsonify({'message': 'Request body is too large'}), 413
 
-# Register Blueprints
-app.register_blueprint(auth_bp)
-app.register_blueprint(event_bp)
-app.register_blueprint(contact_bp)
-app.register_blueprint(user_bp)
-app.register_blueprint(ai_bp)
+    register_query_tracking(app)
+    register_query_deadlines(app)
 
+    # Initialize extensions
+    jwt.init_app(app)
+    register_user_loader(jwt)
+    register_revocation_loaders(jwt)
+    cors.init_app(app, resources={r"/api/*": {"origins": app.config['CORS_ORIGINS']}})
 
-# Error Handlers
-@app.errorhandler(404)
-def not_found(error):
-    return jsonify({'message': 'Resource not found'}), 404
+    # Register Blueprints
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(event_bp)
+    app.register_blueprint(contact_bp)
+    app.register_blueprint(user_bp)
+    app.register_blueprint(ai_bp)
 
-@app.errorhandler(500)
-def internal_error(error):
-    return jsonify({'message': 'Internal server error'}), 500
+    # Create the query indexes the routes rely on (idempotent); deployments that
+    # manage indexes separately run `python indexes.py apply` instead
+    if app.config['CREATE_INDEXES_ON_STARTUP']:
+        try:
+            for name, result in ensure_indexes().items():
+                if 'error' in result:
+                    print(f"Index creation failed for {name}: {result['error']}")
+        except PyMongoError as e:
+            print(f"Index creation skipped: {e}")
+
+    # Without the unique indexes duplicate registrations and sign-ups would go
+    # through. Sign-up and event registration check for them before writing
+    # and answer 503 while one is missing, so the rest of the site keeps
+    # serving; REQUIRE_INDEXES_ON_STARTUP refuses to start instead.
+    # `python indexes.py apply` lists the duplicates that block them
+    try:
+        missing = missing_required_indexes()
+    except PyMongoError as e:
+        print(f"Required index check skipped: {e}")
+    else:
+        if missing:
+            message = (f"Required unique indexes are missing: {', '.join(missing)}; "
+                       f"run `python indexes.py apply` and remove the duplicates it reports")
+            if app.config['REQUIRE_INDEXES_ON_STARTUP']:
+                raise RuntimeError(message)
+            print(f"{message}. Sign-up and registration answer 503 until then")
+
+    # Bring events from before registration counters up to date before any
+    # registration is served (same as `python counters.py --migrate`)
+    if app.config['MIGRATE_ON_STARTUP']:
+        try:
+            result = migrate_events()
+            if result['cast'] or result['backfilled']:
+                print(f"Migrated events: {result['cast']} numeric fields, "
+                      f"{result['backfilled']} registration counts")
+        except PyMongoError as e:
+            print(f"Event migration skipped: {e}")
+
+    # In 'thread' mode each worker process runs queued jobs, including ones
+    # left behind by a process that died; start the pool on first request so
+    # it is never started before gunicorn forks
+    if app.config['JOBS_MODE'] == 'thread':
+        @app.before_request
+        def start_job_runner():
+            get_job_runner().start()
+
+    # Error Handlers
+    @app.errorhandler(404)
+    def not_found(error):
+        return jsonify({'message': 'Resource not found'}), 404
+
+    @app.errorhandler(500)
+    def internal_error(error):
+        return jsonify({'message': 'Internal server error'}), 500
+
+    # Liveness: the process is up and serving requests; /api/health is kept
+    # for existing probes
+    @app.route('/api/health', methods=['GET'])
+    @app.route('/api/health/live', methods=['GET'])
+    def health_check():
+        return jsonify({'status': 'healthy', 'timestamp': datetime.utcnow().isoformat()}), 200
+
+    # Readiness: MongoDB answers within READINESS_TIMEOUT; load balancers
+    # should stop routing to a worker that returns 503
+    @app.route('/api/health/ready', methods=['GET'])
+    def readiness_check():
+        mongo_status = get_readiness_check().check()
+        return jsonify({
+            'status': 'ready' if mongo_status['ok'] else 'unavailable',
+            'timestamp': datetime.utcnow().isoformat(),
+            'mongo': mongo_status,
+            'pool': pool_monitor.stats()
+        }), 200 if mongo_status['ok'] else 503
+
+    def collect_stats():
+        cache = get_response_cache()
+        contact_writer = get_contact_writer()
+        return {
+            'response_cache': cache.stats() if cache else None,
+            'password_hasher': get_password_hasher().stats(),
+            'user_cache': get_user_cache().stats(),
+            'revocation_list': get_revocation_list().stats(),
+            'single_flight': get_single_flight().stats(),
+            'contact_writer': contact_writer.stats() if contact_writer else None,
+            'job_runner': get_job_runner().stats(),
+            'mongo_pool': pool_monitor.stats(),
+            'load_shedding': load_shedder.stats()
+        }
+
+    # Runtime counters for sizing caches and queues
+    @app.route('/api/stats', methods=['GET'])
+    def stats():
+        return jsonify(collect_stats()), 200
+
+    # The same counters plus request metrics, for Prometheus to scrape
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics():
+        body = get_request_metrics().render(collect_stats())
+        return app.response_class(body, content_type=METRICS_CONTENT_TYPE), 200
+
+    return app
 
-# Health check route
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    return jsonify({'status': 'healthy', 'timestamp': datetime.utcnow().isoformat()}), 200
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Development server; production runs wsgi:app under gunicorn
+    create_app().run(debug=Config.DEBUG, host='0.0.0.0', port=5000)
@@ -0,0 +1,166 @@
+from datetime import datetime
+from urllib.parse import parse_qsl
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import http_date, is_resource_modified, quote_etag
+from config import Config
+from helpers.conditional import VALIDATOR_FIELDS, compute_validators
+from helpers.event_query import build_events_list_query
+from helpers.pagination import page_cursor, split_page
+from helpers.projection import event_projection
+from helpers.seat_shards import apply_shard_totals, shard_totals_pipeline, sharded_event_ids
+from helpers.serializer import dumpb
+
+# Asyncio read path for the public event endpoints, served by an ASGI server:
+#   uvicorn asgi:app --workers 4
+# It answers GET /api/events, GET /api/events/<id> and GET /api/health with
+# the same query builders, validators and JSON encoding as the Flask views.
+
+_client = None
+
+
+def get_db():
+    # Created inside the running event loop on first use
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(Config.MONGO_URI)
+    return _client[Config.MONGO_DB_NAME]
+
+
+class Request:
+
+    def __init__(self, scope):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.query_string = scope['query_string'].decode('latin-1')
+        self.args = MultiDict(parse_qsl(self.query_string))
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1')
+                        for name, value in scope['headers']}
+
+    def not_modified(self, etag, last_modified):
+        environ = {
+            'REQUEST_METHOD': self.method,
+            'HTTP_IF_NONE_MATCH': self.headers.get('if-none-match', ''),
+            'HTTP_IF_MODIFIED_SINCE': self.headers.get('if-modified-since', '')
+        }
+        return not is_resource_modified(environ, etag=etag, last_modified=last_modified)
+
+    @property
+    def is_conditional(self):
+        return 'if-none-match' in self.headers or 'if-modified-since' in self.headers
+
+
+def json_response(data, status=200, headers=None):
+    return status, dumpb(data), dict(headers or {}, **{'Content-Type': 'application/json'})
+
+
+def validator_headers(etag, last_modified):
+    headers = {'ETag': quote_etag(etag), 'Cache-Control': 'public, no-cache'}
+    if last_modified:
+        headers['Last-Modified'] = http_date(last_modified)
+    return headers
+
+
+async def attach_shard_counts(db, events):
+    event_ids = sharded_event_ids(events)
+    if not event_ids:
+        return events
+    rows = await db.seat_shards.aggregate(shard_totals_pipeline(event_ids)).to_list(None)
+    return apply_shard_totals(events, {row['_id']: row['used'] for row in rows})
+
+
+async def fetch_page(db, query, projection, limit):
+    docs = await page_cursor(db.events.find(query, projection), limit).to_list(limit + 1)
+    events, next_cursor = split_page(docs, limit)
+    await attach_shard_counts(db, events)
+    return events, next_cursor
+
+
+async def get_events(request):
+    db = get_db()
+    query, projection, limit = build_events_list_query(
+        request.args, Config.EVENTS_PAGE_SIZE, Config.EVENTS_MAX_PAGE_SIZE
+    )
+
+    # Revalidation: probe only the validator fields of this page first. Like
+    # the Flask view, the list is validated by ETag alone
+    if 'if-none-match' in request.headers:
+        probe, probe_cursor = await fetch_page(db, query, VALIDATOR_FIELDS, limit)
+        etag, _ = compute_validators(probe, request.query_string, probe_cursor)
+        if request.not_modified(etag, None):
+            return 304, b'', validator_headers(etag, None)
+
+    events, next_cursor = await fetch_page(db, query, projection, limit)
+    etag, _ = compute_validators(events, request.query_string, next_cursor)
+    return json_response({'events': events, 'next_cursor': next_cursor},
+                         headers=validator_headers(etag, None))
+
+
+async def get_event(request, event_id):
+    db = get_db()
+    projection = event_projection(request.args.get('fields'))
+    event = await db.events.find_one({'_id': ObjectId(event_id)}, projection)
+    if not event:
+        return json_response({'message': 'Event not found'}, 404)
+
+    event.setdefault('registeredCount', 0)
+    await attach_shard_counts(db, [event])
+
+    etag, last_modified = compute_validators([event], request.query_string)
+    if request.not_modified(etag, last_modified):
+        return 304, b'', validator_headers(etag, last_modified)
+    return json_response({'event': event}, headers=validator_headers(etag, last_modified))
+
+
+async def health_check(request):
+    return json_response({'status': 'healthy', 'timestamp': datetime.utcnow().isoformat()})
+
+
+async def dispatch(request):
+    if request.method not in ('GET', 'HEAD'):
+        return json_response({'message': 'Method not allowed'}, 405)
+    parts = request.path.rstrip('/').split('/')
+    try:
+        if request.path.rstrip('/') == '/api/health':
+            return await health_check(request)
+        if parts[:3] == ['', 'api', 'events'] and len(parts) == 3:
+            return await get_events(request)
+        if parts[:3] == ['', 'api', 'events'] and len(parts) == 4:
+            return await get_event(request, parts[3])
+        return json_response({'message': 'Resource not found'}, 404)
+    except ValueError as e:
+        return json_response({'message': str(e)}, 400)
+    except Exception as e:
+        return json_response({'message': str(e)}, 500)
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if _client is not None:
+                    _client.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    request = Request(scope)
+    status, body, headers = await dispatch(request)
+
+    origin = request.headers.get('origin')
+    if origin and origin in Config.CORS_ORIGINS:
+        headers['Access-Control-Allow-Origin'] = origin
+        headers['Vary'] = 'Origin'
+    if request.method == 'HEAD':
+        body = b''
+
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                    for name, value in headers.items()]
+    })
+    await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,62 @@
+import argparse
+import os
+import resource
+import sys
+from benchmarks.common import drop_database, print_table, require_mongo
+from benchmarks.loadgen import load, start_server, stop_server
+from benchmarks.serving import seed
+
+# GET /api/events at 1k concurrent connections: the threaded Flask app under
+# the gunicorn profile (:5000) against the asyncio read path under uvicorn
+# (:5001). Both read the same seeded benchmark database with the response
+# cache off (the async path has none).
+
+
+def raise_open_files(connections):
+    # Each connection is a descriptor in this process and in the server
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = connections * 2 + 256
+    if soft < wanted:
+        limit = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Async read path vs threaded path at high concurrency')
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--events', type=int, default=500)
+    parser.add_argument('--uvicorn-workers', type=int, default=2)
+    args = parser.parse_args()
+
+    raise_open_files(args.connections)
+    db = require_mongo()
+    seed(db, args.events)
+    env = {'MONGO_DB_NAME': os.environ['MONGO_DB_NAME'], 'GUNICORN_BIND': '127.0.0.1:5000',
+           'RESPONSE_CACHE_BACKEND': 'off'}
+
+    servers = [
+        ('threaded (gunicorn)', 'http://127.0.0.1:5000',
+         [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']),
+        (f'async (uvicorn x{args.uvicorn_workers})', 'http://127.0.0.1:5001',
+         [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', '5001',
+          '--workers', str(args.uvicorn_workers), '--no-access-log']),
+    ]
+    rows = []
+    try:
+        for name, url, command in servers:
+            process = start_server(command, url + '/api/health', env)
+            try:
+                load(url + '/api/events', args.connections, 2)  # warm-up
+                rows.append([name] + load(url + '/api/events', args.connections, args.seconds))
+            finally:
+                stop_server(process)
+    finally:
+        drop_database()
+
+    print(f'GET /api/events, {args.connections} connections, {args.seconds:.0f}s, {os.cpu_count()} CPUs')
+    print_table(['server', 'req/s', 'p50 ms', 'p99 ms', 'failed'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import threading
+import time
+
+# Shared setup for the benchmarks. Run them from backend/ as modules, e.g.
+# `python -m benchmarks.seat_shards`. Benchmarks that need MongoDB (MONGO_URI)
+# work in their own database, eventpro_bench or BENCH_MONGO_DB_NAME, which is
+# dropped when they finish.
+os.environ['MONGO_DB_NAME'] = os.getenv('BENCH_MONGO_DB_NAME', 'eventpro_bench')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pymongo
+from flask_jwt_extended import create_access_token
+from config import Config
+from extensions import mongo
+
+
+class BenchConfig(Config):
+    # Measure the code path itself: no caches, shedding or queueing in front
+    CREATE_INDEXES_ON_STARTUP = False
+    MIGRATE_ON_STARTUP = False
+    RESPONSE_CACHE_BACKEND = 'off'
+    CONTACT_WRITE_MODE = 'sync'
+    JOBS_MODE = 'inline'
+    LOAD_SHEDDING_ENABLED = False
+    WAITING_ROOM_BURST = 10 ** 9
+    WAITING_ROOM_RATE = 10 ** 9
+
+
+def require_mongo():
+    try:
+        with pymongo.timeout(2):
+            mongo.client.admin.command('ping')
+    except pymongo.errors.PyMongoError as e:
+        sys.exit(f'This benchmark needs MongoDB at MONGO_URI: {e}')
+    mongo.client.drop_database(mongo.database_name)
+    return mongo.database
+
+
+def drop_database():
+    mongo.client.drop_database(mongo.database_name)
+
+
+def make_app(**overrides):
+    from app import create_app
+    from indexes import ensure_indexes
+    ensure_indexes()
+    return create_app(type('Config', (BenchConfig,), overrides))
+
+
+def make_tokens(app, db, count, prefix='bench'):
+    # Users plus a bearer header for each
+    user_ids = db.users.insert_many([
+        {'name': f'{prefix} {i}', 'email': f'{prefix}{i}@example.com', 'password': 'unused'}
+        for i in range(count)
+    ]).inserted_ids
+    with app.app_context():
+        return [{'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+                for user_id in user_ids]
+
+
+def run_threads(clients, work):
+    # Run work(client_index) on `clients` threads at once; returns wall seconds
+    barrier = threading.Barrier(clients + 1)
+
+    def run(index):
+        barrier.wait()
+        work(index)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for row in [headers] + rows:
+        print('  '.join(str(value).rjust(width) for value, width in zip(row, widths)))
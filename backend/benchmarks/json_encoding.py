@@ -0,0 +1,99 @@
+import argparse
+import copy
+import json
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from flask import Flask
+from benchmarks.common import print_table
+from helpers.serializer import MongoJSONProvider
+
+# Encoding 10k event documents into a JSON response: the old two-pass path
+# (serialize_doc mutating each document, then jsonify with sorted keys)
+# against MongoJSONProvider, which encodes raw documents in one pass. No
+# MongoDB needed. The documents stay within what the old path could encode:
+# no ObjectIds inside lists, and an _id on every embedded document.
+
+
+def serialize_doc(doc):
+    # The removed helpers/serializer.serialize_doc, kept as the baseline
+    if doc is None:
+        return None
+    doc['_id'] = str(doc['_id'])
+    for key, value in doc.items():
+        if isinstance(value, datetime):
+            doc[key] = value.isoformat()
+        elif isinstance(value, ObjectId):
+            doc[key] = str(value)
+        elif isinstance(value, dict):
+            doc[key] = serialize_doc(value)
+    return doc
+
+
+def make_events(count):
+    now = datetime(2026, 6, 1, 12, 0)
+    return [{
+        '_id': ObjectId(),
+        'title': f'Community meetup #{i}',
+        'description': 'An evening of talks, demos and conversation. ' * 8,
+        'date': '2026-09-01',
+        'time': '18:30',
+        'location': 'Lahore',
+        'venue': {'_id': ObjectId(), 'name': 'Expo Centre', 'hall': i % 4},
+        'category': 'technology',
+        'price': 12.5,
+        'maxAttendees': 100,
+        'registeredCount': i % 100,
+        'image': f'https://example.com/events/{i}.jpg',
+        'status': 'published',
+        'tags': ['talks', 'networking', 'food'],
+        'organizer_id': ObjectId(),
+        'created_at': now - timedelta(days=i % 30),
+        'updated_at': now
+    } for i in range(count)]
+
+
+def best_of(repeat, setup, run):
+    times = []
+    for _ in range(repeat):
+        value = setup()
+        started = time.perf_counter()
+        body = run(value)
+        times.append(time.perf_counter() - started)
+    return min(times), body
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON encoding: two-pass serializer vs MongoJSONProvider')
+    parser.add_argument('--documents', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    events = make_events(args.documents)
+    old_app = Flask('two_pass')
+    new_app = Flask('one_pass')
+    new_app.json = MongoJSONProvider(new_app)
+
+    def two_pass(docs):
+        with old_app.app_context():
+            return old_app.json.response({'events': [serialize_doc(doc) for doc in docs]}).get_data()
+
+    def one_pass(docs):
+        with new_app.app_context():
+            return new_app.json.response({'events': docs}).get_data()
+
+    # The old path mutates its input, so each run gets a fresh copy (not timed)
+    old_time, old_body = best_of(args.repeat, lambda: copy.deepcopy(events), two_pass)
+    new_time, new_body = best_of(args.repeat, lambda: events, one_pass)
+    assert json.loads(old_body) == json.loads(new_body)
+
+    print(f'{args.documents} event documents, best of {args.repeat}')
+    print_table(['path', 'ms', 'bytes'], [
+        ['serialize_doc + jsonify', f'{old_time * 1000:.1f}', len(old_body)],
+        ['MongoJSONProvider', f'{new_time * 1000:.1f}', len(new_body)],
+    ])
+    print(f'speedup: {old_time / new_time:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
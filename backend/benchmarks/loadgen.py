@@ -0,0 +1,115 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from urllib.parse import urlsplit
+from benchmarks.common import percentile
+
+# A small HTTP/1.1 load generator on asyncio: `connections` keep-alive
+# connections each send GET requests back to back for `seconds`. Servers that
+# close after every response (the Werkzeug dev server speaks HTTP/1.0) are
+# reconnected. It shares the machine with the server under test, so compare
+# servers with the same settings rather than reading the numbers as absolute;
+# wrk gives higher ceilings when it is available.
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    version, status = status_line.decode('latin-1').split()[:2]
+    length = None
+    keep_alive = version == 'HTTP/1.1'
+    while True:
+        line = (await reader.readline()).decode('latin-1').strip()
+        if not line:
+            break
+        name, _, value = line.partition(':')
+        name = name.lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'connection':
+            keep_alive = value.strip().lower() == 'keep-alive' or (
+                keep_alive and value.strip().lower() != 'close')
+    if length is None:
+        await reader.read()
+        keep_alive = False
+    else:
+        await reader.readexactly(length)
+    return int(status), keep_alive
+
+
+async def _client(host, port, request, deadline, latencies, statuses):
+    connection = None
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if connection is None:
+                connection = await asyncio.open_connection(host, port)
+            reader, writer = connection
+            writer.write(request)
+            status, keep_alive = await _read_response(reader)
+        except (OSError, ValueError, asyncio.IncompleteReadError):
+            statuses['error'] = statuses.get('error', 0) + 1
+            if connection is not None:
+                connection[1].close()
+            connection = None
+            await asyncio.sleep(0.01)
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+        statuses[status] = statuses.get(status, 0) + 1
+        if not keep_alive:
+            connection[1].close()
+            connection = None
+    if connection is not None:
+        connection[1].close()
+
+
+async def _run(url, connections, seconds):
+    parts = urlsplit(url)
+    path = parts.path + (f'?{parts.query}' if parts.query else '')
+    request = (f'GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n'
+               f'Connection: keep-alive\r\n\r\n').encode('latin-1')
+    latencies = []
+    statuses = {}
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*[_client(parts.hostname, parts.port or 80, request, deadline, latencies, statuses)
+                           for _ in range(connections)])
+    return latencies, statuses
+
+
+def load(url, connections, seconds):
+    # Returns [requests/s, p50 ms, p99 ms, non-200 responses and errors]
+    latencies, statuses = asyncio.run(_run(url, connections, seconds))
+    failed = sum(count for status, count in statuses.items() if status != 200)
+    return [f'{statuses.get(200, 0) / seconds:.0f}', f'{percentile(latencies, 0.5):.1f}',
+            f'{percentile(latencies, 0.99):.1f}', failed]
+
+
+def start_server(command, url, env=None):
+    # Start a server from backend/ and wait until `url` answers
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=dict(os.environ, **(env or {})),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f'{" ".join(command)} exited with {process.returncode}')
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    sys.exit(f'{" ".join(command)} did not answer {url}')
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
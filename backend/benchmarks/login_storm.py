@@ -0,0 +1,119 @@
+import argparse
+import os
+import threading
+import time
+from benchmarks.common import (drop_database, make_app, percentile, print_table, require_mongo,
+                               run_threads)
+from config import Config
+from helpers.passwords import PasswordHasher
+
+# Two measurements for password hashing:
+#   pool: hashes per second with 1, 8 and 64 concurrent callers, inline
+#         against the process pool (no MongoDB needed)
+#   storm: GET /api/events latency while other clients hammer
+#          POST /api/auth/login, with inline hashing and with the pool
+# Use --only to run one of them.
+
+PASSWORD = 'correct horse battery staple'
+
+
+def pool_throughput(callers_list, hashes, workers):
+    rows = []
+    for callers in callers_list:
+        row = [callers]
+        for pool_workers in (0, workers):
+            hasher = PasswordHasher(Config.PASSWORD_HASH_METHOD, pool_workers, 10 ** 6, 60)
+            hasher.hash(PASSWORD)  # start the pool outside the timing
+            per_caller = max(1, hashes // callers)
+
+            def work(index):
+                for _ in range(per_caller):
+                    hasher.hash(PASSWORD)
+
+            elapsed = run_threads(callers, work)
+            row.append(f'{per_caller * callers / elapsed:.1f}')
+        rows.append(row)
+    print(f'Hashes per second ({Config.PASSWORD_HASH_METHOD})')
+    print_table(['callers', 'inline', f'pool ({workers})'], rows)
+
+
+def read_latency(app, readers, logins, seconds):
+    # GET /api/events latencies (ms) from `readers` clients while `logins`
+    # clients log in back to back
+    stop = threading.Event()
+    latencies = []
+    outcomes = {}
+    lock = threading.Lock()
+
+    def login_loop():
+        client = app.test_client()
+        while not stop.is_set():
+            status = client.post('/api/auth/login', json={
+                'email': 'storm@example.com', 'password': PASSWORD
+            }).status_code
+            with lock:
+                outcomes[status] = outcomes.get(status, 0) + 1
+
+    def read_loop():
+        client = app.test_client()
+        samples = []
+        while not stop.is_set():
+            started = time.perf_counter()
+            assert client.get('/api/events').status_code == 200
+            samples.append((time.perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(samples)
+
+    threads = [threading.Thread(target=login_loop) for _ in range(logins)]
+    threads += [threading.Thread(target=read_loop) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies, outcomes
+
+
+def login_storm(readers, logins, seconds, workers):
+    db = require_mongo()
+    rows = []
+    try:
+        for name, pool_workers, storm in (('no logins', workers, 0),
+                                          ('storm, inline', 0, logins),
+                                          (f'storm, pool ({workers})', workers, logins)):
+            app = make_app(PASSWORD_HASH_WORKERS=pool_workers)
+            db.users.delete_many({})
+            response = app.test_client().post('/api/auth/register', json={
+                'name': 'Storm', 'email': 'storm@example.com', 'password': PASSWORD
+            })
+            assert response.status_code == 201, response.get_json()
+            latencies, outcomes = read_latency(app, readers, storm, seconds)
+            rows.append([name, len(latencies), f'{percentile(latencies, 0.5):.1f}',
+                         f'{percentile(latencies, 0.99):.1f}',
+                         outcomes.get(200, 0), outcomes.get(503, 0)])
+    finally:
+        drop_database()
+    print(f'GET /api/events with {readers} readers and {logins} login clients, {seconds}s each')
+    print_table(['run', 'reads', 'p50 ms', 'p99 ms', 'logins', 'login 503s'], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Password hashing pool and login storm benchmarks')
+    parser.add_argument('--only', choices=['pool', 'storm'])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='pool processes')
+    parser.add_argument('--callers', type=int, nargs='+', default=[1, 8, 64])
+    parser.add_argument('--hashes', type=int, default=128, help='per pool run')
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--logins', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    if args.only != 'storm':
+        pool_throughput(args.callers, args.hashes, args.workers)
+    if args.only != 'pool':
+        login_storm(args.readers, args.logins, args.seconds, args.workers)
+
+
+if __name__ == '__main__':
+    main()
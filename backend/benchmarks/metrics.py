@@ -0,0 +1,46 @@
+import argparse
+import time
+from benchmarks.common import print_table, run_threads
+from helpers.metrics import RequestMetrics
+
+# Instrumentation cost per request: the start() + observe() pair the request
+# hooks run, from 1, 8 and 32 threads recording at once (each into its own
+# shard), and how long a scrape takes to merge and render what they recorded.
+# No MongoDB needed.
+
+ROUTES = [('events', f'/api/events/route{i}', method) for i in range(20) for method in ('GET', 'POST')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Request metrics overhead and contention')
+    parser.add_argument('--requests', type=int, default=200000, help='per thread')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8, 32])
+    args = parser.parse_args()
+
+    rows = []
+    for threads in args.threads:
+        metrics = RequestMetrics()
+
+        def work(index):
+            for i in range(args.requests):
+                started = metrics.start()
+                metrics.observe(ROUTES[i % len(ROUTES)], 200, started, 128, 4096, 3, 0.002)
+
+        elapsed = run_threads(threads, work)
+        total = threads * args.requests
+        started = time.perf_counter()
+        body = metrics.render()
+        render_ms = (time.perf_counter() - started) * 1000
+        merged, _ = metrics.snapshot()
+        assert sum(sum(series.statuses.values()) for series in merged.values()) == total
+        # With the GIL, threads take turns: wall time per request is the cost
+        # each request adds, including any contention between threads
+        rows.append([threads, total, f'{elapsed / total * 1e6:.2f}',
+                     f'{render_ms:.1f}', body.count('\n')])
+
+    print(f'{args.requests} requests per thread over {len(ROUTES)} routes')
+    print_table(['threads', 'requests', 'us/request', 'scrape ms', 'lines'], rows)
+
+
+if __name__ == '__main__':
+    main()
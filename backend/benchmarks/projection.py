@@ -0,0 +1,101 @@
+import argparse
+import time
+from datetime import datetime
+from benchmarks.common import drop_database, make_app, make_tokens, print_table, require_mongo
+from helpers.projection import EVENT_FIELDS
+
+# Payload size and time for listing 1,000 events: every field (what the list
+# endpoints returned before sparse fieldsets), the default card projection,
+# and a minimal fields= selection. GET /api/events is paged through with
+# `after` cursors; GET /api/user/events returns the organizer's events at once.
+
+DESCRIPTION = ('Join us for a full day of talks, workshops and networking with people '
+               'from across the region. Lunch and refreshments are included. ') * 12
+
+
+def seed(db, organizer_id, count):
+    now = datetime.utcnow()
+    db.events.insert_many([{
+        'title': f'Conference day {i}',
+        'description': DESCRIPTION,
+        'date': f'2026-{1 + i % 12:02d}-{1 + i % 28:02d}',
+        'time': '09:00',
+        'location': 'Karachi',
+        'venue': 'Expo Centre, Hall 2',
+        'category': 'business',
+        'price': 25,
+        'maxAttendees': 300,
+        'registeredCount': i % 300,
+        'image': f'https://images.example.com/events/{i}/cover-1600x900.jpg',
+        'status': 'published',
+        'organizer_id': organizer_id,
+        'created_at': now,
+        'updated_at': now
+    } for i in range(count)])
+
+
+def list_all(client, fields, page_size):
+    # Follow next_cursor through every page; returns (bytes, events, seconds)
+    total = events = 0
+    after = None
+    started = time.perf_counter()
+    while True:
+        query = {'limit': page_size}
+        if fields:
+            query['fields'] = fields
+        if after:
+            query['after'] = after
+        response = client.get('/api/events', query_string=query)
+        body = response.get_json()
+        total += len(response.get_data())
+        events += len(body['events'])
+        after = body['next_cursor']
+        if not after:
+            return total, events, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='List payloads with and without projections')
+    parser.add_argument('--events', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    db = require_mongo()
+    app = make_app()
+    [headers] = make_tokens(app, db, 1, prefix='organizer')
+    organizer_id = db.users.find_one({}, {'_id': 1})['_id']
+    seed(db, organizer_id, args.events)
+    client = app.test_client()
+    page_size = app.config['EVENTS_MAX_PAGE_SIZE']
+
+    variants = [
+        ('all fields', ','.join(EVENT_FIELDS)),
+        ('default (cards)', None),
+        ('fields=title,date,price', 'title,date,price'),
+    ]
+    rows = []
+    try:
+        for name, fields in variants:
+            runs = [list_all(client, fields, page_size) for _ in range(args.repeat)]
+            size, count, _ = runs[0]
+            assert count == args.events
+            best = min(seconds for _, _, seconds in runs)
+
+            query = {'fields': fields} if fields else {}
+            times = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                response = client.get('/api/user/events', headers=headers, query_string=query)
+                times.append(time.perf_counter() - started)
+            rows.append([name, size, f'{best * 1000:.1f}',
+                         len(response.get_data()), f'{min(times) * 1000:.1f}'])
+    finally:
+        drop_database()
+
+    print(f'{args.events} events, best of {args.repeat}')
+    print_table(['projection', '/events bytes', 'ms', '/user/events bytes', 'ms'], rows)
+    print(f'card payload is {rows[1][1] / rows[0][1]:.0%} of the full one')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import time
+import uuid
+from flask import Flask
+from benchmarks.common import print_table
+from config import Config
+from helpers.revocation import RevocationList
+
+# Cost of the per-request revocation check (token_in_blocklist_loader) with
+# no revoked tokens and with 1M of them, plus load time and memory of the
+# list. The revoked ids come from a generated stand-in for the
+# revoked_tokens collection, so no MongoDB is needed.
+
+
+class GeneratedRevocations:
+    # Answers the full load with `count` ids and incremental refreshes with none
+
+    def __init__(self, count):
+        self.count = count
+
+    def find(self, query, projection=None):
+        if query:
+            return iter(())
+        return ({'_id': f'revoked-{i}'} for i in range(self.count))
+
+
+def per_check_ns(revocations, jtis, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for jti in jtis:
+            revocations.is_revoked(jti)
+        elapsed = (time.perf_counter() - started) / len(jtis) * 1e9
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Revocation check overhead with many revoked tokens')
+    parser.add_argument('--revoked', type=int, nargs='+', default=[0, 1000000])
+    parser.add_argument('--checks', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask('revocation_benchmark')
+    app.config.from_object(Config)
+    fresh = [str(uuid.uuid4()) for _ in range(args.checks)]
+    rows = []
+    with app.app_context():
+        for count in args.revoked:
+            revocations = RevocationList(GeneratedRevocations(count), Config.REVOCATION_BLOOM_CAPACITY,
+                                         Config.REVOCATION_BLOOM_ERROR_RATE, 3600, 3600)
+            started = time.perf_counter()
+            revocations.is_revoked('warm-up')  # the first check loads the list
+            load_seconds = time.perf_counter() - started
+
+            revoked = [f'revoked-{i}' for i in range(0, count, max(1, count // args.checks))]
+            stats = revocations.stats()
+            memory = stats['bloom_bits'] / 8 + stats['revoked'] * 8
+            # Bloom positives on valid tokens are the ones settled by the exact set
+            positives = revocations.bloom_positives
+            valid_ns = per_check_ns(revocations, fresh, args.repeat)
+            false_positives = (revocations.bloom_positives - positives) / (len(fresh) * args.repeat)
+            rows.append([
+                count,
+                f'{load_seconds:.2f}',
+                f'{memory / 2 ** 20:.1f}',
+                f'{valid_ns:.0f}',
+                f'{per_check_ns(revocations, revoked, args.repeat):.0f}' if revoked else '-',
+                f'{false_positives:.4%}'
+            ])
+            assert all(revocations.is_revoked(jti) for jti in revoked)
+
+    print(f'{args.checks} checks, best of {args.repeat}')
+    print_table(['revoked', 'load s', 'MiB', 'ns/check (valid)', 'ns/check (revoked)',
+                 'bloom false positives'], rows)
+
+
+if __name__ == '__main__':
+    main()
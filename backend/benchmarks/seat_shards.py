@@ -0,0 +1,59 @@
+import argparse
+from datetime import datetime
+from benchmarks.common import drop_database, make_app, make_tokens, print_table, require_mongo, run_threads
+from helpers import seat_shards
+
+# Registration throughput of a single counter document against seat shards at
+# 1, 8 and 64 concurrent clients. Every registration is a distinct user on an
+# event large enough never to fill, so each one claims a seat and inserts a
+# registration through POST /api/events/<id>/register.
+
+
+def create_event(db, shards, capacity):
+    event_id = db.events.insert_one({
+        'title': 'Benchmark', 'date': '2026-09-01', 'status': 'published',
+        'maxAttendees': capacity, 'registeredCount': 0, 'seatShards': shards,
+        'updated_at': datetime.utcnow()
+    }).inserted_id
+    if shards > 1:
+        seat_shards.configure_shards(event_id, capacity, shards)
+    return event_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Registration throughput: single counter vs seat shards')
+    parser.add_argument('--registrations', type=int, default=2000, help='per run')
+    parser.add_argument('--shards', type=int, default=16)
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 64])
+    args = parser.parse_args()
+
+    db = require_mongo()
+    app = make_app()
+    headers = make_tokens(app, db, args.registrations)
+    rows = []
+    try:
+        for clients in args.clients:
+            row = [clients]
+            for shards in (0, args.shards):
+                event_id = create_event(db, shards, args.registrations * 10)
+                db.registrations.delete_many({})
+                per_client = args.registrations // clients
+
+                def work(index):
+                    client = app.test_client()
+                    for user in headers[index * per_client:(index + 1) * per_client]:
+                        response = client.post(f'/api/events/{event_id}/register', headers=user)
+                        assert response.status_code == 201, response.get_json()
+
+                elapsed = run_threads(clients, work)
+                row.append(f'{per_client * clients / elapsed:.0f}')
+            rows.append(row)
+    finally:
+        drop_database()
+
+    print(f'Registrations per second ({args.registrations} per run)')
+    print_table(['clients', 'counter', f'{args.shards} shards'], rows)
+
+
+if __name__ == '__main__':
+    main()
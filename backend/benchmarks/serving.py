@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+from datetime import datetime
+from benchmarks.common import drop_database, print_table, require_mongo
+from benchmarks.loadgen import load, start_server, stop_server
+
+# Requests per second for GET /api/events from the development server
+# (`python app.py`) and the production profile (gunicorn.conf.py) on the same
+# machine, one after the other on port 5000. Both use the benchmark database,
+# seeded with published events. The response cache is off unless --cache is
+# given, so each request reaches MongoDB.
+
+URL = 'http://127.0.0.1:5000'
+
+
+def seed(db, count):
+    now = datetime.utcnow()
+    db.events.insert_many([{
+        'title': f'Event {i}', 'description': 'Benchmark event',
+        'date': f'2026-{1 + i % 12:02d}-{1 + i % 28:02d}', 'time': '18:00',
+        'location': 'Islamabad', 'category': 'music', 'price': 10,
+        'maxAttendees': 100, 'registeredCount': 0, 'status': 'published',
+        'created_at': now, 'updated_at': now
+    } for i in range(count)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dev server vs production profile throughput')
+    parser.add_argument('--connections', type=int, default=64)
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--events', type=int, default=500)
+    parser.add_argument('--path', default='/api/events')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache on')
+    args = parser.parse_args()
+
+    db = require_mongo()
+    seed(db, args.events)
+    env = {'MONGO_DB_NAME': os.environ['MONGO_DB_NAME'], 'GUNICORN_BIND': '127.0.0.1:5000'}
+    if not args.cache:
+        env['RESPONSE_CACHE_BACKEND'] = 'off'
+
+    servers = [
+        ('dev server', [sys.executable, 'app.py']),
+        ('gunicorn profile', [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']),
+    ]
+    rows = []
+    try:
+        for name, command in servers:
+            process = start_server(command, URL + '/api/health/live', env)
+            try:
+                load(URL + args.path, args.connections, 2)  # warm-up
+                rows.append([name] + load(URL + args.path, args.connections, args.seconds))
+            finally:
+                stop_server(process)
+    finally:
+        drop_database()
+
+    print(f'GET {args.path}, {args.connections} connections, {args.seconds:.0f}s, {os.cpu_count()} CPUs')
+    print_table(['server', 'req/s', 'p50 ms', 'p99 ms', 'failed'], rows)
+
+
+if __name__ == '__main__':
+    main()
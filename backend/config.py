@@ -8,3 +8,104 @@ class Config:
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-secret-key-change-this')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=7)
     MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/eventpro')
+    MONGO_DB_NAME = os.getenv('MONGO_DB_NAME', 'eventpro')
+    # Debug mode only when explicitly requested (FLASK_DEBUG=true)
+    DEBUG = os.getenv('FLASK_DEBUG', 'false').lower() in ('1', 'true')
+    CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:5173').split(',')
+    # Largest request body accepted; bigger ones get 413 before a route reads them
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 1024 * 1024))
+    CREATE_INDEXES_ON_STARTUP = os.getenv('CREATE_INDEXES_ON_STARTUP', 'true').lower() == 'true'
+    # Upgrade events from before registration counters at startup (counters.py --migrate)
+    MIGRATE_ON_STARTUP = os.getenv('MIGRATE_ON_STARTUP', 'true').lower() == 'true'
+    # Refuse to start while a required unique index is missing; by default only
+    # the routes that depend on it are refused
+    REQUIRE_INDEXES_ON_STARTUP = os.getenv('REQUIRE_INDEXES_ON_STARTUP', 'false').lower() == 'true'
+
+    # Keyset pagination for GET /api/events
+    EVENTS_PAGE_SIZE = int(os.getenv('EVENTS_PAGE_SIZE', 20))
+    EVENTS_MAX_PAGE_SIZE = int(os.getenv('EVENTS_MAX_PAGE_SIZE', 100))
+
+    # Upper bound on seat shard documents for flash-sale events
+    FLASH_SALE_MAX_SHARDS = int(os.getenv('FLASH_SALE_MAX_SHARDS', 64))
+
+    # Waiting room in front of event registration: 'memory' for a single
+    # process, 'mongo' to share the queue across workers, 'off' to disable
+    WAITING_ROOM_BACKEND = os.getenv('WAITING_ROOM_BACKEND', 'memory')
+    WAITING_ROOM_RATE = float(os.getenv('WAITING_ROOM_RATE', 50))  # admissions per second
+    WAITING_ROOM_BURST = int(os.getenv('WAITING_ROOM_BURST', 100))
+    WAITING_ROOM_TICKET_TTL = int(os.getenv('WAITING_ROOM_TICKET_TTL', 600))  # seconds
+
+    # Response cache for public event reads: 'memory', 'mongo', 'off', or the
+    # import path of a custom backend class
+    RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 30))  # seconds
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+
+    # Password hashing runs in a process pool; the method string carries the
+    # algorithm and cost, and older hashes are upgraded on successful login
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))  # 0 = inline
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 64))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))  # seconds
+
+    # Process-wide cache of user documents for JWT-authenticated requests
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 60))  # seconds
+    USER_CACHE_MAX_ENTRIES = int(os.getenv('USER_CACHE_MAX_ENTRIES', 10000))
+
+    # Token revocation: Bloom filter sizing and how often workers pick up
+    # revocations made elsewhere
+    REVOCATION_BLOOM_CAPACITY = int(os.getenv('REVOCATION_BLOOM_CAPACITY', 1000000))
+    REVOCATION_BLOOM_ERROR_RATE = float(os.getenv('REVOCATION_BLOOM_ERROR_RATE', 0.001))
+    REVOCATION_REFRESH_INTERVAL = float(os.getenv('REVOCATION_REFRESH_INTERVAL', 2))  # seconds
+    REVOCATION_REBUILD_INTERVAL = float(os.getenv('REVOCATION_REBUILD_INTERVAL', 3600))  # seconds
+
+    # Collapse concurrent identical event detail reads into one MongoDB fetch
+    SINGLE_FLIGHT_ENABLED = os.getenv('SINGLE_FLIGHT_ENABLED', 'true').lower() == 'true'
+
+    # Contact submissions: 'buffered' batches inserts in the background and
+    # answers 202, 'sync' inserts inside the request
+    CONTACT_WRITE_MODE = os.getenv('CONTACT_WRITE_MODE', 'buffered')
+    CONTACT_BATCH_SIZE = int(os.getenv('CONTACT_BATCH_SIZE', 100))
+    CONTACT_FLUSH_INTERVAL = float(os.getenv('CONTACT_FLUSH_INTERVAL', 1))  # seconds
+    CONTACT_MAX_PENDING = int(os.getenv('CONTACT_MAX_PENDING', 10000))
+    # Failed inserts per document before it goes to contacts_failed
+    CONTACT_MAX_ATTEMPTS = int(os.getenv('CONTACT_MAX_ATTEMPTS', 3))
+
+    # Background jobs: 'thread' runs them on a pool inside each web worker,
+    # 'worker' only queues them for worker.py, 'inline' runs them in the request
+    JOBS_MODE = os.getenv('JOBS_MODE', 'thread')
+    JOBS_WORKERS = int(os.getenv('JOBS_WORKERS', 2))
+    JOBS_POLL_INTERVAL = float(os.getenv('JOBS_POLL_INTERVAL', 1))  # seconds
+    JOBS_LEASE = int(os.getenv('JOBS_LEASE', 300))  # seconds a claimed job is reserved
+    JOBS_MAX_ATTEMPTS = int(os.getenv('JOBS_MAX_ATTEMPTS', 5))
+    JOBS_RETRY_BACKOFF = float(os.getenv('JOBS_RETRY_BACKOFF', 5))  # seconds, doubled per attempt
+    JOBS_RETENTION = int(os.getenv('JOBS_RETENTION', 7 * 24 * 3600))  # seconds finished jobs are kept
+
+    # MongoDB command accounting: commands slower than this are logged with
+    # their filter shape (0 disables), and responses carry a Server-Timing header
+    MONGO_SLOW_QUERY_MS = float(os.getenv('MONGO_SLOW_QUERY_MS', 100))
+    SERVER_TIMING = os.getenv('SERVER_TIMING', 'true').lower() == 'true'
+
+    # Readiness probe: MongoDB ping deadline and how long its result is reused
+    READINESS_TIMEOUT = float(os.getenv('READINESS_TIMEOUT', 0.5))  # seconds
+    READINESS_CACHE_TTL = float(os.getenv('READINESS_CACHE_TTL', 0.5))  # seconds
+
+    # MongoDB time budget per request in seconds (0 = none), with per-endpoint
+    # overrides, e.g. QUERY_DEADLINES='events.get_events=2,auth.login=5'
+    QUERY_DEADLINE = float(os.getenv('QUERY_DEADLINE', 5))
+    QUERY_DEADLINES = {
+        endpoint.strip(): float(seconds)
+        for endpoint, seconds in (item.split('=', 1) for item in os.getenv('QUERY_DEADLINES', '').split(',') if item.strip())
+    }
+    QUERY_RETRY_AFTER = int(os.getenv('QUERY_RETRY_AFTER', 1))  # seconds
+
+    # Adaptive concurrency limits per request class (reads, writes, login and
+    # register): the most requests a worker handles at once, and the latency
+    # in seconds above which the limit backs off
+    LOAD_SHEDDING_ENABLED = os.getenv('LOAD_SHEDDING_ENABLED', 'true').lower() == 'true'
+    CONCURRENCY_READ_LIMIT = int(os.getenv('CONCURRENCY_READ_LIMIT', 16))
+    CONCURRENCY_READ_LATENCY = float(os.getenv('CONCURRENCY_READ_LATENCY', 0.5))
+    CONCURRENCY_WRITE_LIMIT = int(os.getenv('CONCURRENCY_WRITE_LIMIT', 8))
+    CONCURRENCY_WRITE_LATENCY = float(os.getenv('CONCURRENCY_WRITE_LATENCY', 1))
+    CONCURRENCY_AUTH_LIMIT = int(os.getenv('CONCURRENCY_AUTH_LIMIT', 4))
+    CONCURRENCY_AUTH_LATENCY = float(os.getenv('CONCURRENCY_AUTH_LATENCY', 2))
@@ -0,0 +1,130 @@
+import argparse
+import sys
+from pymongo import UpdateOne
+from models.collections import events_collection, registrations_collection
+from helpers import seat_shards
+
+BATCH_SIZE = 1000
+
+# Fields the UI used to send as strings, with the defaults the routes apply
+NUMERIC_FIELDS = {'maxAttendees': 100, 'price': 0}
+
+
+def migrate_events(dry_run=False):
+    # Upgrade events written before registration counters existed: cast string
+    # maxAttendees/price to numbers (a string compares above every number, so
+    # the seat check would never stop them) and fill in a missing
+    # registeredCount from the registrations. NaN and infinite values (which
+    # older builds accepted as 'nan'/'inf') get the default too. Idempotent;
+    # run it before the new registration path serves traffic.
+    cast = 0
+    for field, default in NUMERIC_FIELDS.items():
+        query = {'$or': [{field: {'$type': 'string'}},
+                         {field: {'$in': [float('nan'), float('inf'), float('-inf')]}}]}
+        if dry_run:
+            cast += events_collection.count_documents(query)
+            continue
+        number = {'$convert': {'input': {'$cond': [{'$eq': [{'$type': '$' + field}, 'string']},
+                                                   {'$trim': {'input': '$' + field}}, '$' + field]},
+                               'to': 'double', 'onError': default, 'onNull': default}}
+        # NaN sorts below every number, so this range is false for it too
+        finite = {'$and': [{'$gte': ['$$n', -sys.float_info.max]}, {'$lte': ['$$n', sys.float_info.max]}]}
+        result = events_collection.update_many(query, [{'$set': {field: {'$let': {
+            'vars': {'n': number},
+            # Whole numbers are stored as integers, like parse_number does
+            'in': {'$cond': [{'$not': [finite]}, default,
+                             {'$cond': [{'$eq': ['$$n', {'$trunc': '$$n'}]}, {'$toLong': '$$n'}, '$$n']}]}
+        }}}}])
+        cast += result.modified_count
+
+    missing = [event['_id'] for event in
+               events_collection.find({'registeredCount': {'$exists': False}}, {'_id': 1})]
+    if not dry_run:
+        for start in range(0, len(missing), BATCH_SIZE):
+            batch = missing[start:start + BATCH_SIZE]
+            pipeline = [
+                {'$match': {'event_id': {'$in': batch}}},
+                {'$group': {'_id': '$event_id', 'count': {'$sum': 1}}}
+            ]
+            counts = {row['_id']: row['count'] for row in registrations_collection.aggregate(pipeline)}
+            events_collection.bulk_write([
+                UpdateOne({'_id': event_id, 'registeredCount': {'$exists': False}},
+                          {'$set': {'registeredCount': counts.get(event_id, 0)}})
+                for event_id in batch
+            ], ordered=False)
+
+    return {'cast': cast, 'backfilled': len(missing)}
+
+
+def repair_counter(event_id, drift, dry_run=False):
+    # Re-count one event's registrations and fix its counter only if the
+    # drift seen by the full scan is still there, so a counter that merely
+    # looked off against a stale aggregate is left alone. The write is a
+    # compare-and-set on the value just read: a registration or cancellation
+    # landing meanwhile changes the counter and the write is skipped (the
+    # next run looks again)
+    event = events_collection.find_one({'_id': event_id}, {'registeredCount': 1})
+    if event is None:
+        return False
+    observed = event.get('registeredCount')
+    expected = registrations_collection.count_documents({'event_id': event_id})
+    if (observed or 0) - expected != drift:
+        return False
+    if dry_run:
+        return True
+    result = events_collection.update_one({'_id': event_id, 'registeredCount': observed},
+                                          {'$set': {'registeredCount': expected}})
+    return result.modified_count == 1
+
+
+def reconcile_registration_counts(dry_run=False):
+    # Recompute every event's registeredCount from the registrations
+    # collection and rewrite only the counters that drifted
+    pipeline = [{'$group': {'_id': '$event_id', 'count': {'$sum': 1}}}]
+    actual = {row['_id']: row['count'] for row in registrations_collection.aggregate(pipeline)}
+
+    checked = 0
+    repaired = 0
+    sharded = []
+    for event in events_collection.find({}, {'registeredCount': 1, 'maxAttendees': 1, 'seatShards': 1}):
+        checked += 1
+        expected = actual.get(event['_id'], 0)
+        if seat_shards.is_sharded(event):
+            sharded.append(event)
+            continue
+        if event.get('registeredCount') == expected:
+            continue
+        if repair_counter(event['_id'], (event.get('registeredCount') or 0) - expected, dry_run):
+            repaired += 1
+
+    # Flash-sale events keep their count on seat shards; rebuild the shards
+    # of any event whose shard total disagrees with its registrations
+    totals = seat_shards.shard_totals([event['_id'] for event in sharded])
+    for event in sharded:
+        expected = actual.get(event['_id'], 0)
+        if totals.get(event['_id']) == expected:
+            continue
+        repaired += 1
+        if not dry_run:
+            seat_shards.configure_shards(event['_id'], event.get('maxAttendees', 100),
+                                         event['seatShards'], expected)
+
+    return {'checked': checked, 'repaired': repaired}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Repair drifted event registration counters')
+    parser.add_argument('--dry-run', action='store_true', help='report drift without writing')
+    parser.add_argument('--migrate', action='store_true',
+                        help='first upgrade events from before registration counters')
+    args = parser.parse_args()
+
+    if args.migrate:
+        result = migrate_events(dry_run=args.dry_run)
+        action = 'would fix' if args.dry_run else 'fixed'
+        print(f"Migration {action} {result['cast']} numeric fields, "
+              f"{result['backfilled']} missing registration counts")
+
+    result = reconcile_registration_counts(dry_run=args.dry_run)
+    action = 'would repair' if args.dry_run else 'repaired'
+    print(f"Checked {result['checked']} events, {action} {result['repaired']} counters")
@@ -1,9 +1,75 @@
+import os
+import threading
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from pymongo import MongoClient
 from config import Config
+from helpers.query_tracker import query_tracker
+from helpers.health import pool_monitor
 
 jwt = JWTManager()
 cors = CORS()
-client = MongoClient(Config.MONGO_URI)
-db = client.eventpro
+
+
+class MongoConnection:
+    # MongoClient is not fork-safe, so it is created on first use and again in
+    # every process that inherits one (e.g. gunicorn workers after preload)
+
+    def __init__(self, uri, database, event_listeners=()):
+        self.uri = uri
+        self.database_name = database
+        self.event_listeners = list(event_listeners)
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._client = MongoClient(self.uri, event_listeners=self.event_listeners)
+                    self._pid = os.getpid()
+        return self._client
+
+    @property
+    def database(self):
+        return self.client[self.database_name]
+
+
+class LazyCollection:
+    # Stands in for a pymongo Collection at import time and resolves it
+    # against the current process's client on use
+
+    def __init__(self, connection, name):
+        self._connection = connection
+        self._name = name
+        self._collection = None
+        self._pid = None
+
+    def __getattr__(self, attr):
+        if self._pid != os.getpid():
+            self._collection = self._connection.database[self._name]
+            self._pid = os.getpid()
+        return getattr(self._collection, attr)
+
+
+class LazyDatabase:
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._collections = {}
+
+    def __getitem__(self, name):
+        if name not in self._collections:
+            self._collections[name] = LazyCollection(self._connection, name)
+        return self._collections[name]
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self[name]
+
+
+mongo = MongoConnection(Config.MONGO_URI, Config.MONGO_DB_NAME, [query_tracker, pool_monitor])
+db = LazyDatabase(mongo)
@@ -0,0 +1,41 @@
+import multiprocessing
+import os
+
+# Production serving profile. Requests mostly wait on MongoDB, so each worker
+# process runs several threads; the worker count follows the CPU count.
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+worker_class = 'gthread'
+workers = int(os.getenv('GUNICORN_WORKERS', cpu_count * 2 + 1))
+# More threads than the load-shedding limits combined, so those limits (not
+# a full thread pool) decide when requests are turned away
+threads = int(os.getenv('GUNICORN_THREADS', 32))
+
+# Every worker starts its own password hashing pool. Split the CPUs between
+# them instead of giving each worker cpu_count processes (read by config.py,
+# which preload_app imports after this file)
+os.environ.setdefault('PASSWORD_HASH_WORKERS', str(max(1, cpu_count // workers)))
+
+# The in-memory waiting room and response cache are per process: a queue
+# ticket polled on another worker is unknown there, admissions multiply by the
+# worker count and cache invalidations reach one worker only. Share them
+# through MongoDB unless a backend is chosen explicitly
+if workers > 1:
+    os.environ.setdefault('WAITING_ROOM_BACKEND', 'mongo')
+    os.environ.setdefault('RESPONSE_CACHE_BACKEND', 'mongo')
+
+# Load the app once in the master and fork it; MongoClient, worker pools and
+# background threads are created per process on first use
+preload_app = True
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers periodically to bound memory growth
+max_requests = 10000
+max_requests_jitter = 1000
+
+accesslog = '-'
+errorlog = '-'
@@ -0,0 +1,197 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import wraps
+from bson import Binary
+from pymongo import ReturnDocument
+from flask import current_app, request
+from werkzeug.utils import import_string
+
+# Response cache for public reads. Entries hold the already-encoded JSON body,
+# so a hit skips both MongoDB and serialization. Keys embed a version token per
+# namespace ('events' for the list, 'event:<id>' for one event); writes bump the
+# version, which orphans every cached variant of that namespace at once.
+
+# Response headers that are replayed on a cache hit
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+
+class LocalCache:
+    # In-process TTL + LRU backend
+
+    def __init__(self, max_entries=1024, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_version(self, namespace):
+        with self._lock:
+            item = self._entries.get('version:' + namespace)
+            if item is not None:
+                self._entries.move_to_end('version:' + namespace)
+                return item[1]
+        # A missing version (never set, or evicted) gets a fresh token, so
+        # entries cached under an older one can never be served again
+        version = uuid.uuid4().hex
+        with self._lock:
+            item = self._entries.setdefault('version:' + namespace, (None, version))
+        return item[1]
+
+    def bump_version(self, namespace):
+        # ttl=0: versions never expire, they only leave through LRU eviction
+        self.set('version:' + namespace, uuid.uuid4().hex, ttl=0)
+
+    def stats(self):
+        return {
+            'backend': 'memory',
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+
+class MongoCache:
+    # Shared backend for multi-worker deployments; expired entries are
+    # removed by the TTL index on expires_at
+
+    def __init__(self, collection, ttl=30):
+        self.collection = collection
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        doc = self.collection.find_one({'_id': key, 'expires_at': {'$gt': datetime.utcnow()}})
+        if doc is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {'body': bytes(doc['body']), 'headers': doc['headers']}
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        self.collection.replace_one(
+            {'_id': key},
+            {
+                'body': Binary(value['body']),
+                'headers': value['headers'],
+                'expires_at': datetime.utcnow() + timedelta(seconds=ttl)
+            },
+            upsert=True
+        )
+
+    def get_version(self, namespace):
+        doc = self.collection.find_one({'_id': 'version:' + namespace})
+        if doc is None:
+            doc = self.collection.find_one_and_update(
+                {'_id': 'version:' + namespace},
+                {'$setOnInsert': {'version': uuid.uuid4().hex}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        return doc['version']
+
+    def bump_version(self, namespace):
+        self.collection.update_one(
+            {'_id': 'version:' + namespace},
+            {'$set': {'version': uuid.uuid4().hex}},
+            upsert=True
+        )
+
+    def stats(self):
+        return {'backend': 'mongo', 'hits': self.hits, 'misses': self.misses, 'evictions': 0}
+
+
+def get_response_cache():
+    cache = current_app.extensions.get('response_cache')
+    if cache is None:
+        config = current_app.config
+        backend = config['RESPONSE_CACHE_BACKEND']
+        ttl = config['RESPONSE_CACHE_TTL']
+        if backend == 'memory':
+            cache = LocalCache(config['RESPONSE_CACHE_MAX_ENTRIES'], ttl)
+        elif backend == 'mongo':
+            from models.collections import response_cache_collection
+            cache = MongoCache(response_cache_collection, ttl)
+        elif backend == 'off':
+            cache = False
+        else:
+            # Any other value is the import path of a class with the same
+            # interface, e.g. 'myapp.cache.RedisCache'
+            cache = import_string(backend)(ttl=ttl)
+        current_app.extensions['response_cache'] = cache
+    return cache
+
+
+def cached_response(*namespaces):
+    # Cache successful responses of a public GET view. Namespaces may use the
+    # view's URL arguments, e.g. cached_response('event:{event_id}')
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_response_cache()
+            if not cache:
+                return view(*args, **kwargs)
+
+            versions = [cache.get_version(ns.format(**kwargs)) for ns in namespaces]
+            key = '|'.join([request.path, request.query_string.decode('latin-1')] + versions)
+
+            entry = cache.get(key)
+            if entry is not None:
+                # Cached validators answer If-None-Match without touching MongoDB
+                response = current_app.response_class(entry['body'], headers=entry['headers'])
+                return response.make_conditional(request)
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                cache.set(key, {
+                    'body': response.get_data(),
+                    'headers': {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+                })
+            return response
+        return wrapper
+    return decorator
+
+
+def invalidate(*namespaces):
+    cache = get_response_cache()
+    if cache:
+        for namespace in namespaces:
+            cache.bump_version(namespace)
@@ -0,0 +1,125 @@
+import threading
+import time
+from flask import g, jsonify, request
+
+# Adaptive load shedding. Requests are split into classes (cheap public reads,
+# authenticated writes, password-hashing auth routes), each with its own
+# concurrency limit. A request over its class limit is rejected at once with
+# 503 instead of waiting for a thread. Limits follow AIMD on observed latency:
+# a slow or failed request cuts the limit by BACKOFF, and fast requests raise
+# it by about one per window of `limit` completions, up to the configured
+# maximum. When MongoDB slows down, reads stop piling up behind it while
+# logins and writes keep their own budget.
+
+BACKOFF = 0.9
+
+AUTH_ENDPOINTS = {'auth.login', 'auth.register'}
+
+# Probes and scrapes are never shed
+EXEMPT_ENDPOINTS = {'health_check', 'readiness_check', 'stats', 'metrics'}
+
+
+class AIMDLimiter:
+
+    def __init__(self, max_limit, latency_target, min_limit=1):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.latency_target = latency_target
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.decreases = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self.in_flight >= int(self.limit):
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            self.accepted += 1
+            return True
+
+    def release(self, latency, failed=False):
+        with self._lock:
+            in_flight = self.in_flight
+            self.in_flight -= 1
+            if failed or latency > self.latency_target:
+                self.limit = max(self.min_limit, self.limit * BACKOFF)
+                self.decreases += 1
+            elif in_flight * 2 >= self.limit:
+                # Only grow while the limit is actually being used
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def stats(self):
+        return {
+            'limit': int(self.limit),
+            'max_limit': self.max_limit,
+            'in_flight': self.in_flight,
+            'accepted': self.accepted,
+            'rejected': self.rejected,
+            'decreases': self.decreases
+        }
+
+
+def request_class():
+    if request.method == 'OPTIONS' or request.endpoint in EXEMPT_ENDPOINTS:
+        return None
+    if request.endpoint in AUTH_ENDPOINTS:
+        return 'auth'
+    if request.method in ('GET', 'HEAD'):
+        return 'read'
+    return 'write'
+
+
+class LoadShedder:
+
+    def __init__(self, limiters):
+        self.limiters = limiters
+
+    def stats(self):
+        # Flat keys (read_limit, write_rejected, ...) so /api/metrics exports them
+        return {f'{name}_{key}': value
+                for name, limiter in self.limiters.items()
+                for key, value in limiter.stats().items()}
+
+
+def register_load_shedding(app):
+    config = app.config
+    shedder = app.extensions['load_shedder'] = LoadShedder({
+        'read': AIMDLimiter(config['CONCURRENCY_READ_LIMIT'], config['CONCURRENCY_READ_LATENCY']),
+        'write': AIMDLimiter(config['CONCURRENCY_WRITE_LIMIT'], config['CONCURRENCY_WRITE_LATENCY']),
+        'auth': AIMDLimiter(config['CONCURRENCY_AUTH_LIMIT'], config['CONCURRENCY_AUTH_LATENCY'])
+    })
+    if not config['LOAD_SHEDDING_ENABLED']:
+        return shedder
+
+    @app.before_request
+    def admit_request():
+        name = request_class()
+        if name is None:
+            return None
+        limiter = shedder.limiters[name]
+        if not limiter.acquire():
+            response = jsonify({'message': 'Server is busy, please retry'})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(config['QUERY_RETRY_AFTER'])
+            return response
+        g.concurrency_slot = (limiter, time.perf_counter())
+        return None
+
+    @app.after_request
+    def note_status(response):
+        g.concurrency_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def release_slot(error=None):
+        slot = g.pop('concurrency_slot', None)
+        if slot is not None:
+            limiter, started = slot
+            failed = error is not None or g.pop('concurrency_status', 500) >= 500
+            limiter.release(time.perf_counter() - started, failed)
+
+    return shedder
@@ -0,0 +1,56 @@
+import hashlib
+from flask import current_app, request
+from werkzeug.http import is_resource_modified
+
+# Validators only need these fields, so freshness probes project down to them
+VALIDATOR_FIELDS = {'date': 1, 'updated_at': 1, 'registeredCount': 1, 'seatShards': 1}
+
+
+def has_conditional_headers(collection=False):
+    # Collections are validated by ETag alone (see collection_validators)
+    if collection:
+        return bool(request.if_none_match)
+    return bool(request.if_none_match or request.if_modified_since)
+
+
+def compute_validators(docs, *parts):
+    # Strong ETag over each document's identity, edit time and registration
+    # count plus any extra parts; Last-Modified is the newest edit
+    parts = [str(part) for part in parts]
+    last_modified = None
+    for doc in docs:
+        updated_at = doc.get('updated_at')
+        parts.append(f"{doc['_id']}:{updated_at}:{doc.get('registeredCount', 0)}")
+        if updated_at and (last_modified is None or updated_at > last_modified):
+            last_modified = updated_at
+    etag = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+    return etag, last_modified
+
+
+def document_validators(docs, *extra):
+    # The query string is part of the representation (filters, fields=)
+    return compute_validators(docs, request.query_string.decode('latin-1'), *extra)
+
+
+def collection_validators(docs, *extra):
+    # ETag only: when an event leaves a list (unpublished, deleted, moved to
+    # another page) the newest updated_at of what remains doesn't move, so a
+    # Last-Modified would answer 304 for a list that has changed
+    etag, _ = document_validators(docs, *extra)
+    return etag, None
+
+
+def add_validators(response, etag, last_modified, private=False):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    # Clients may store the response but must revalidate before reuse
+    response.headers['Cache-Control'] = 'private, no-cache' if private else 'public, no-cache'
+    return response
+
+
+def not_modified(etag, last_modified, private=False):
+    # 304 response when the client's copy is still current, otherwise None
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return add_validators(current_app.response_class(status=304), etag, last_modified, private)
@@ -0,0 +1,65 @@
+import contextvars
+import pymongo
+from flask import current_app, g, jsonify, request
+from pymongo.errors import PyMongoError
+
+# Per-request deadline for MongoDB work. Each request runs inside
+# pymongo.timeout(), so every driver call in it (server selection, connection
+# checkout and the command itself, sent with maxTimeMS) shares one budget.
+# The budget is QUERY_DEADLINE seconds, or a per-endpoint override from
+# QUERY_DEADLINES. A request that runs out answers 503 with Retry-After.
+
+
+def is_timeout(error):
+    return isinstance(error, PyMongoError) and error.timeout
+
+
+def timeout_response():
+    response = jsonify({'message': 'The database did not respond in time, please retry'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(current_app.config['QUERY_RETRY_AFTER'])
+    return response
+
+
+def error_response(error):
+    # For a route's catch-all except: deadline errors become 503, the rest 500
+    if is_timeout(error):
+        return timeout_response()
+    return jsonify({'message': str(error)}), 500
+
+
+def outside_deadline(fn, *args):
+    # Run fn with a fresh budget instead of what is left of the request's.
+    # Compensating writes (e.g. giving back a claimed seat) must still run
+    # after the request deadline has expired.
+    seconds = current_app.config['QUERY_DEADLINE'] or None
+
+    def run():
+        with pymongo.timeout(seconds):
+            return fn(*args)
+    return contextvars.Context().run(run)
+
+
+def register_query_deadlines(app):
+
+    @app.before_request
+    def start_deadline():
+        config = app.config
+        seconds = config['QUERY_DEADLINES'].get(request.endpoint, config['QUERY_DEADLINE'])
+        if seconds:
+            g.query_deadline = pymongo.timeout(seconds)
+            g.query_deadline.__enter__()
+
+    @app.teardown_request
+    def end_deadline(error=None):
+        deadline = g.pop('query_deadline', None)
+        if deadline is not None:
+            deadline.__exit__(None, None, None)
+
+    # Timeouts raised outside a route's own except (auth loaders, the response
+    # cache) get the same 503
+    @app.errorhandler(PyMongoError)
+    def database_error(error):
+        if is_timeout(error):
+            return timeout_response()
+        return jsonify({'message': 'Internal server error'}), 500
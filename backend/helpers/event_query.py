@@ -0,0 +1,83 @@
+import math
+import re
+from datetime import datetime
+from helpers.pagination import keyset_filter, parse_limit
+from helpers.projection import EVENT_CARD_FIELDS, event_projection
+
+# Statuses that may be listed on the public catalog; drafts stay private
+PUBLIC_STATUSES = ('published', 'cancelled')
+
+
+def parse_number(value, name):
+    if value in (None, ''):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be a number')
+    # float() also accepts 'nan' and 'inf', which would break range filters and
+    # the seat check, and can't be written as JSON
+    if not math.isfinite(number):
+        raise ValueError(f'{name} must be a number')
+    return int(number) if number.is_integer() else number
+
+
+def parse_date(value, name):
+    # Event dates are stored as YYYY-MM-DD strings, which sort chronologically
+    if value in (None, ''):
+        return None
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be a date in YYYY-MM-DD format')
+    return value
+
+
+def build_events_filter(args):
+    status = args.get('status') or 'published'
+    if status not in PUBLIC_STATUSES:
+        raise ValueError(f"status must be one of: {', '.join(PUBLIC_STATUSES)}")
+
+    query = {'status': status}
+
+    q = (args.get('q') or '').strip()
+    if q:
+        query['$text'] = {'$search': q}
+
+    category = args.get('category')
+    if category and category != 'All':
+        query['category'] = category
+
+    # Anchored, case-sensitive prefix so the location index bounds the scan
+    location = (args.get('location') or '').strip()
+    if location:
+        query['location'] = {'$regex': '^' + re.escape(location)}
+
+    date_from = parse_date(args.get('date_from'), 'date_from')
+    date_to = parse_date(args.get('date_to'), 'date_to')
+    if date_from or date_to:
+        query['date'] = {}
+        if date_from:
+            query['date']['$gte'] = date_from
+        if date_to:
+            query['date']['$lte'] = date_to
+
+    price_min = parse_number(args.get('price_min'), 'price_min')
+    price_max = parse_number(args.get('price_max'), 'price_max')
+    if price_min is not None or price_max is not None:
+        query['price'] = {}
+        if price_min is not None:
+            query['price']['$gte'] = price_min
+        if price_max is not None:
+            query['price']['$lte'] = price_max
+
+    return query
+
+
+def build_events_list_query(args, page_size, max_page_size):
+    # Everything GET /api/events needs from its query string; shared by the
+    # Flask view and the async read path
+    limit = parse_limit(args.get('limit'), page_size, max_page_size)
+    query = keyset_filter(build_events_filter(args), args.get('after'))
+    projection = event_projection(args.get('fields'), EVENT_CARD_FIELDS)
+    return query, projection, limit
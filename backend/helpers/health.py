@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+import pymongo
+from flask import current_app
+from pymongo import monitoring
+
+# Readiness for load balancers: a MongoDB ping under a short deadline, cached
+# briefly so frequent probes from many balancers cost at most one ping per
+# window. Pool statistics come from the MongoClient's connection pool events.
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    # Counters cover the current process only; a forked worker starts from
+    # zero with its own client
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self.open = 0
+        self.in_use = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _count(self, name, delta=1):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            setattr(self, name, getattr(self, name) + delta)
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, 'started', None)
+        waited = time.perf_counter() - started if started is not None else 0.0
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            self.in_use += 1
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def connection_check_out_failed(self, event):
+        self._count('checkout_failures')
+
+    def connection_checked_in(self, event):
+        self._count('in_use', -1)
+
+    def connection_created(self, event):
+        self._count('open')
+
+    def connection_closed(self, event):
+        self._count('open', -1)
+
+    def pool_cleared(self, event):
+        self._count('pool_clears')
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def stats(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            return {
+                'open': self.open,
+                'in_use': self.in_use,
+                'checkouts': self.checkouts,
+                'checkout_failures': self.checkout_failures,
+                'pool_clears': self.pool_clears,
+                'avg_wait_ms': round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.wait_max * 1000, 3)
+            }
+
+
+pool_monitor = PoolMonitor()
+
+
+class ReadinessCheck:
+
+    def __init__(self, connection, timeout=0.5, cache_ttl=0.5):
+        self.connection = connection
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self._lock = threading.Lock()
+        self._result = None
+        self._checked_at = 0.0
+
+    def check(self):
+        # Probes arriving while a ping is in flight wait for it (at most the
+        # deadline) and share its result
+        with self._lock:
+            if self._result is None or time.monotonic() - self._checked_at >= self.cache_ttl:
+                self._result = self._ping()
+                self._checked_at = time.monotonic()
+            return self._result
+
+    def _ping(self):
+        started = time.perf_counter()
+        try:
+            with pymongo.timeout(self.timeout):
+                self.connection.client.admin.command('ping')
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+        return {'ok': True, 'latency_ms': round((time.perf_counter() - started) * 1000, 2)}
+
+
+def get_readiness_check():
+    readiness = current_app.extensions.get('readiness_check')
+    if readiness is None:
+        from extensions import mongo
+        config = current_app.config
+        readiness = ReadinessCheck(mongo, config['READINESS_TIMEOUT'], config['READINESS_CACHE_TTL'])
+        current_app.extensions['readiness_check'] = readiness
+    return readiness
@@ -0,0 +1,42 @@
+from bson import ObjectId
+from flask import current_app, jsonify
+from helpers.cache import LocalCache
+from models.collections import users_collection
+
+# Process-wide cache of user documents keyed by JWT identity. Within a request
+# flask-jwt-extended keeps the loaded user on g, so current_user is looked up
+# at most once per request and, across requests, once per cache window.
+
+
+def get_user_cache():
+    cache = current_app.extensions.get('user_cache')
+    if cache is None:
+        config = current_app.config
+        cache = LocalCache(config['USER_CACHE_MAX_ENTRIES'], config['USER_CACHE_TTL'])
+        current_app.extensions['user_cache'] = cache
+    return cache
+
+
+def invalidate_user(identity):
+    get_user_cache().delete(str(identity))
+
+
+def register_user_loader(jwt):
+
+    @jwt.user_lookup_loader
+    def load_user(jwt_header, jwt_data):
+        identity = jwt_data[current_app.config['JWT_IDENTITY_CLAIM']]
+        cache = get_user_cache()
+        user = cache.get(identity)
+        if user is None:
+            # Cached documents are shared between requests: never include the
+            # password hash and never mutate them
+            user = users_collection.find_one({'_id': ObjectId(identity)}, {'password': 0})
+            if user is None:
+                return None
+            cache.set(identity, user)
+        return user
+
+    @jwt.user_lookup_error_loader
+    def user_not_found(jwt_header, jwt_data):
+        return jsonify({'message': 'User not found'}), 404
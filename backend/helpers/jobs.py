@@ -0,0 +1,239 @@
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+# Persistent background jobs for slow side effects (cascading deletes, counter
+# repair). Jobs live in the jobs collection and are claimed with a lease, so a
+# job whose worker died is picked up again once the lease runs out. Handlers
+# must be idempotent: a job may run more than once before it is marked done.
+# A dedupe_key keeps a second copy of a job from being queued while the first
+# is still pending or running.
+
+HANDLERS = {}
+
+MAX_BACKOFF = 300  # seconds
+
+
+def job(name):
+    # Register a handler: @job('name') def handler(payload): ...
+    def decorator(fn):
+        HANDLERS[name] = fn
+        return fn
+    return decorator
+
+
+class JobRunner:
+
+    def __init__(self, app, collection, workers=2, poll_interval=1.0, lease=300,
+                 max_attempts=5, retry_backoff=5):
+        self.app = app
+        self.collection = collection
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._pid = None
+        self.worker_id = None
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+
+    def enqueue(self, name, payload=None, dedupe_key=None, max_attempts=None):
+        # Returns the job id; with a dedupe_key, an already queued job's id
+        if name not in HANDLERS:
+            raise ValueError(f'Unknown job: {name}')
+        now = datetime.utcnow()
+        doc = {
+            'name': name,
+            'payload': payload or {},
+            'status': 'pending',
+            'attempts': 0,
+            'max_attempts': max_attempts or self.max_attempts,
+            'run_at': now,
+            'created_at': now
+        }
+        if dedupe_key is not None:
+            doc['dedupe_key'] = dedupe_key
+        try:
+            job_id = self.collection.insert_one(doc).inserted_id
+        except DuplicateKeyError:
+            existing = self.collection.find_one({'dedupe_key': dedupe_key}, {'_id': 1})
+            if existing is None:
+                # The other copy finished in between; queue this one after all
+                return self.enqueue(name, payload, dedupe_key, max_attempts)
+            return existing['_id']
+        self._wakeup.set()
+        return job_id
+
+    def start(self):
+        # Worker threads are per process, so a forked worker starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid() or not self.workers:
+                return
+            self._pid = os.getpid()
+            self.worker_id = f'{socket.gethostname()}:{self._pid}'
+            self._stopping.clear()
+            self._threads = [
+                threading.Thread(target=self._work_loop, name=f'job-runner-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout=None):
+        # Let running jobs finish; anything not finished is retried after its lease
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _work_loop(self):
+        while not self._stopping.is_set():
+            try:
+                if self.run_next():
+                    continue
+            except Exception as e:
+                print(f"Job runner error: {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def claim(self):
+        # Oldest due job, or a running one whose worker let its lease lapse
+        now = datetime.utcnow()
+        return self.collection.find_one_and_update(
+            {'$or': [
+                {'status': 'pending', 'run_at': {'$lte': now}},
+                {'status': 'running', 'lease_until': {'$lt': now}}
+            ]},
+            {
+                '$set': {
+                    'status': 'running',
+                    'lease_until': now + timedelta(seconds=self.lease),
+                    'lease_id': uuid.uuid4().hex,
+                    'worker': self.worker_id or f'{socket.gethostname()}:{os.getpid()}',
+                    'started_at': now
+                },
+                '$inc': {'attempts': 1}
+            },
+            sort=[('run_at', 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def run_next(self):
+        # Claim and run one job; False when nothing is due
+        doc = self.claim()
+        if doc is None:
+            return False
+
+        handler = HANDLERS.get(doc['name'])
+        if handler is None:
+            self._finish(doc, 'failed', error=f"Unknown job: {doc['name']}")
+            return True
+        if doc['attempts'] > doc['max_attempts']:
+            # Its worker kept dying mid-run; stop reclaiming it
+            self._finish(doc, 'failed', error=doc.get('error', 'Lease expired too many times'))
+            return True
+
+        try:
+            with self.app.app_context():
+                result = handler(doc['payload'])
+        except Exception as e:
+            if doc['attempts'] >= doc['max_attempts']:
+                self._finish(doc, 'failed', error=str(e))
+            else:
+                self._retry(doc, str(e))
+            return True
+
+        self._finish(doc, 'done', result=result)
+        return True
+
+    def run_pending(self):
+        # Drain every due job in the calling thread; returns how many ran
+        count = 0
+        while self.run_next():
+            count += 1
+        return count
+
+    def _retry(self, doc, error):
+        delay = min(self.retry_backoff * 2 ** (doc['attempts'] - 1), MAX_BACKOFF)
+        self.collection.update_one(
+            {'_id': doc['_id'], 'lease_id': doc['lease_id']},
+            {
+                '$set': {
+                    'status': 'pending',
+                    'run_at': datetime.utcnow() + timedelta(seconds=delay),
+                    'error': error
+                },
+                '$unset': {'lease_until': '', 'lease_id': ''}
+            }
+        )
+        with self._lock:
+            self.retried += 1
+
+    def _finish(self, doc, status, result=None, error=None):
+        # Terminal jobs release their dedupe_key and expire via the TTL index.
+        # Updates match the lease, so a worker whose job was reclaimed after
+        # its lease lapsed can't overwrite the newer attempt
+        update = {'status': status, 'finished_at': datetime.utcnow()}
+        if result is not None:
+            update['result'] = result
+        if error is not None:
+            update['error'] = error
+        self.collection.update_one(
+            {'_id': doc['_id'], 'lease_id': doc['lease_id']},
+            {'$set': update, '$unset': {'lease_until': '', 'lease_id': '', 'dedupe_key': ''}}
+        )
+        with self._lock:
+            if status == 'done':
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+    def stats(self):
+        return {
+            'workers': len(self._threads) if self._pid == os.getpid() else 0,
+            'succeeded': self.succeeded,
+            'retried': self.retried,
+            'failed': self.failed
+        }
+
+
+def get_job_runner():
+    runner = current_app.extensions.get('job_runner')
+    if runner is None:
+        from models.collections import jobs_collection
+        config = current_app.config
+        runner = JobRunner(
+            current_app._get_current_object(),
+            jobs_collection,
+            # 'worker' mode only queues jobs; worker.py processes run them
+            config['JOBS_WORKERS'] if config['JOBS_MODE'] == 'thread' else 0,
+            config['JOBS_POLL_INTERVAL'],
+            config['JOBS_LEASE'],
+            config['JOBS_MAX_ATTEMPTS'],
+            config['JOBS_RETRY_BACKOFF']
+        )
+        current_app.extensions['job_runner'] = runner
+    return runner
+
+
+def enqueue(name, payload=None, dedupe_key=None, max_attempts=None):
+    # 'inline' mode runs the handler inside the request, e.g. for tests
+    if current_app.config['JOBS_MODE'] == 'inline':
+        HANDLERS[name](payload or {})
+        return None
+    runner = get_job_runner()
+    runner.start()
+    return runner.enqueue(name, payload, dedupe_key, max_attempts)
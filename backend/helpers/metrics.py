@@ -0,0 +1,196 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from flask import current_app, g, request
+from helpers.query_tracker import query_tracker
+
+# Request metrics in Prometheus text format. Each thread records into its own
+# shard, so the request path takes no locks; a scrape merges the shards.
+# Latencies go into fixed log-spaced buckets (two per power of two, 0.5 ms to
+# ~23 s), which bounds the relative error the way an HDR histogram does.
+# Series are labelled with the route template, never the raw path, and with
+# the worker pid, since every gunicorn worker keeps its own counters.
+
+LATENCY_BOUNDS = tuple(0.0005 * 2 ** (i / 2) for i in range(32))  # seconds
+SIZE_BOUNDS = tuple(64 * 4 ** i for i in range(10))  # bytes, 64 B to 16 MB
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class _Series:
+    __slots__ = ('latency', 'latency_sum', 'sizes', 'size_sum', 'request_size_sum', 'statuses',
+                 'db_commands', 'db_seconds')
+
+    def __init__(self):
+        self.latency = [0] * (len(LATENCY_BOUNDS) + 1)
+        self.latency_sum = 0.0
+        self.sizes = [0] * (len(SIZE_BOUNDS) + 1)
+        self.size_sum = 0
+        self.request_size_sum = 0
+        self.statuses = {}
+        self.db_commands = 0
+        self.db_seconds = 0.0
+
+
+class _Shard:
+
+    def __init__(self):
+        self.series = {}
+        self.in_flight = 0
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def start(self):
+        self._shard().in_flight += 1
+        return time.perf_counter()
+
+    def observe(self, key, status, started, request_bytes, response_bytes, db_commands=0, db_seconds=0.0):
+        # key is (blueprint, route, method)
+        elapsed = time.perf_counter() - started
+        shard = self._shard()
+        shard.in_flight -= 1
+        series = shard.series.get(key)
+        if series is None:
+            series = shard.series[key] = _Series()
+        series.latency[bisect_left(LATENCY_BOUNDS, elapsed)] += 1
+        series.latency_sum += elapsed
+        series.sizes[bisect_left(SIZE_BOUNDS, response_bytes)] += 1
+        series.size_sum += response_bytes
+        series.request_size_sum += request_bytes
+        series.statuses[status] = series.statuses.get(status, 0) + 1
+        series.db_commands += db_commands
+        series.db_seconds += db_seconds
+
+    def snapshot(self):
+        # Merge every thread's shard; counters are read without stopping the
+        # writers, so a scrape may miss requests finishing at that moment
+        with self._lock:
+            shards = list(self._shards)
+        merged = {}
+        in_flight = 0
+        for shard in shards:
+            in_flight += shard.in_flight
+            for key, series in list(shard.series.items()):
+                total = merged.get(key)
+                if total is None:
+                    total = merged[key] = _Series()
+                total.latency = [a + b for a, b in zip(total.latency, series.latency)]
+                total.latency_sum += series.latency_sum
+                total.sizes = [a + b for a, b in zip(total.sizes, series.sizes)]
+                total.size_sum += series.size_sum
+                total.request_size_sum += series.request_size_sum
+                total.db_commands += series.db_commands
+                total.db_seconds += series.db_seconds
+                for status, count in list(series.statuses.items()):
+                    total.statuses[status] = total.statuses.get(status, 0) + count
+        return merged, in_flight
+
+    def render(self, stats=None):
+        # Prometheus exposition text; stats is the /api/stats document, whose
+        # numeric values are exported as eventpro_<component>_<name> gauges
+        merged, in_flight = self.snapshot()
+        pid = str(os.getpid())
+        lines = []
+
+        def labels(**values):
+            return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in values.items()) + '}'
+
+        lines.append('# HELP http_requests_total Requests handled, by route and status.')
+        lines.append('# TYPE http_requests_total counter')
+        for (blueprint, route, method), series in sorted(merged.items()):
+            for status, count in sorted(series.statuses.items()):
+                lines.append(f'http_requests_total{labels(blueprint=blueprint, route=route, method=method, status=status, pid=pid)} {count}')
+
+        _histogram(lines, 'http_request_duration_seconds', 'Request latency in seconds.',
+                   merged, LATENCY_BOUNDS, 'latency', 'latency_sum', labels, pid)
+        _histogram(lines, 'http_response_size_bytes', 'Response body size in bytes.',
+                   merged, SIZE_BOUNDS, 'sizes', 'size_sum', labels, pid)
+
+        lines.append('# HELP http_request_size_bytes_total Request body bytes received.')
+        lines.append('# TYPE http_request_size_bytes_total counter')
+        for (blueprint, route, method), series in sorted(merged.items()):
+            lines.append(f'http_request_size_bytes_total{labels(blueprint=blueprint, route=route, method=method, pid=pid)} {series.request_size_sum}')
+
+        # Divide by http_requests_total for round trips and DB time per request
+        lines.append('# HELP http_request_db_commands_total MongoDB commands issued while handling requests.')
+        lines.append('# TYPE http_request_db_commands_total counter')
+        for (blueprint, route, method), series in sorted(merged.items()):
+            lines.append(f'http_request_db_commands_total{labels(blueprint=blueprint, route=route, method=method, pid=pid)} {series.db_commands}')
+        lines.append('# HELP http_request_db_seconds_total Time spent in MongoDB commands while handling requests.')
+        lines.append('# TYPE http_request_db_seconds_total counter')
+        for (blueprint, route, method), series in sorted(merged.items()):
+            lines.append(f'http_request_db_seconds_total{labels(blueprint=blueprint, route=route, method=method, pid=pid)} {series.db_seconds}')
+
+        lines.append('# HELP http_requests_in_flight Requests currently being handled.')
+        lines.append('# TYPE http_requests_in_flight gauge')
+        lines.append(f'http_requests_in_flight{labels(pid=pid)} {in_flight}')
+
+        for component, values in sorted((stats or {}).items()):
+            if not isinstance(values, dict):
+                continue
+            for name, value in sorted(values.items()):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                lines.append(f'# TYPE eventpro_{component}_{name} gauge')
+                lines.append(f'eventpro_{component}_{name}{labels(pid=pid)} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _histogram(lines, name, help_text, merged, bounds, buckets_attr, sum_attr, labels, pid):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for (blueprint, route, method), series in sorted(merged.items()):
+        buckets = getattr(series, buckets_attr)
+        cumulative = 0
+        for bound, count in zip(bounds, buckets):
+            cumulative += count
+            lines.append(f'{name}_bucket{labels(blueprint=blueprint, route=route, method=method, pid=pid, le=f"{bound:.6g}")} {cumulative}')
+        cumulative += buckets[-1]
+        lines.append(f'{name}_bucket{labels(blueprint=blueprint, route=route, method=method, pid=pid, le="+Inf")} {cumulative}')
+        lines.append(f'{name}_sum{labels(blueprint=blueprint, route=route, method=method, pid=pid)} {getattr(series, sum_attr)}')
+        lines.append(f'{name}_count{labels(blueprint=blueprint, route=route, method=method, pid=pid)} {cumulative}')
+
+
+def get_request_metrics():
+    return current_app.extensions['request_metrics']
+
+
+def register_request_metrics(app):
+    # Registered before any other request hook so every request is timed
+    metrics = app.extensions['request_metrics'] = RequestMetrics()
+
+    @app.before_request
+    def start_timer():
+        g.metrics_started = metrics.start()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            rule = request.url_rule
+            key = (request.blueprint or '', rule.rule if rule else 'unmatched', request.method)
+            queries = query_tracker.current()
+            metrics.observe(key, response.status_code, started,
+                            request.content_length or 0, response.content_length or 0,
+                            queries.commands if queries else 0, queries.seconds if queries else 0.0)
+        return response
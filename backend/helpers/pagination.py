@@ -0,0 +1,68 @@
+import base64
+import json
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(doc):
+    # Opaque cursor over the (date, _id) sort key of the last document on a page
+    payload = json.dumps([doc.get('date'), str(doc['_id'])], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date, doc_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return date, ObjectId(doc_id)
+    except (ValueError, TypeError, InvalidId):
+        raise InvalidCursor('Invalid pagination cursor')
+
+
+def parse_limit(value, default, maximum):
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be at least 1')
+    return min(limit, maximum)
+
+
+def keyset_filter(query, after):
+    # Seek past the last seen (date, _id) instead of skipping, so deep pages
+    # cost the same index walk as the first one
+    if not after:
+        return query
+    date, doc_id = decode_cursor(after)
+    seek = {'$or': [
+        {'date': {'$gt': date}},
+        {'date': date, '_id': {'$gt': doc_id}}
+    ]}
+    return {'$and': [query, seek]} if query else seek
+
+
+KEYSET_SORT = [('date', 1), ('_id', 1)]
+
+
+def page_cursor(cursor, limit):
+    # Fetch one extra document to learn whether another page exists
+    return cursor.sort(KEYSET_SORT).limit(limit + 1)
+
+
+def split_page(docs, limit):
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1])
+    return docs, next_cursor
+
+
+def paginate(cursor, limit):
+    return split_page(list(page_cursor(cursor, limit)), limit)
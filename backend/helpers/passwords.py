@@ -0,0 +1,151 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+# Password hashing is deliberately slow CPU work. Running it in a small
+# process pool keeps it from holding request threads (and the GIL), and the
+# pending limit turns a login storm into fast 503s instead of a backlog.
+# A slot stays taken until its job has finished in the pool, even when the
+# request gave up waiting, so timed-out jobs still count against the limit.
+
+
+class HashingBusy(Exception):
+    pass
+
+
+def method_prefix(method):
+    # The 'method:params' prefix Werkzeug writes for a method string, with
+    # its defaults filled in, e.g. 'pbkdf2' -> 'pbkdf2:sha256:600000'
+    name, *args = method.split(':')
+    if name == 'pbkdf2':
+        hash_name = args[0] if args else 'sha256'
+        iterations = int(args[1]) if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{hash_name}:{iterations}'
+    if name == 'scrypt':
+        n, r, p = map(int, args) if args else (2 ** 15, 8, 1)
+        return f'scrypt:{n}:{r}:{p}'
+    return method
+
+
+class PasswordHasher:
+
+    def __init__(self, method, workers, max_pending, timeout):
+        self.method = method
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._prefix = method_prefix(method)
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.pool_restarts = 0
+
+    def _pool(self):
+        # One pool per process: a pool inherited across fork is unusable
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def _discard(self, executor):
+        # A worker died (e.g. OOM-killed) and broke the pool; the next call
+        # starts a fresh one. Queued jobs are cancelled, which frees their slots
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self.pool_restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn, *args):
+        executor = self._pool()
+        try:
+            return executor, executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._discard(executor)
+            executor = self._pool()
+            return executor, executor.submit(fn, *args)
+
+    def _finish(self, future=None):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+        self._slots.release()
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashingBusy('Too many password operations in progress')
+        with self._lock:
+            self.pending += 1
+        if not self.workers:
+            try:
+                return fn(*args)
+            finally:
+                self._finish()
+        try:
+            executor, future = self._submit(fn, *args)
+        except BaseException:
+            self._finish()
+            raise
+        future.add_done_callback(self._finish)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise HashingBusy('Password operation timed out')
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise HashingBusy('Password hashing pool restarted')
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        # Compare the stored 'method:params' prefix with what the configured
+        # method produces today, e.g. 'pbkdf2:sha256:600000'
+        return password_hash.split('$', 1)[0] != self._prefix
+
+    def stats(self):
+        return {
+            'method': self.method,
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'pending': self.pending,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'timeouts': self.timeouts,
+            'pool_restarts': self.pool_restarts
+        }
+
+
+def get_password_hasher():
+    hasher = current_app.extensions.get('password_hasher')
+    if hasher is None:
+        config = current_app.config
+        hasher = PasswordHasher(
+            config['PASSWORD_HASH_METHOD'],
+            config['PASSWORD_HASH_WORKERS'],
+            config['PASSWORD_HASH_MAX_PENDING'],
+            config['PASSWORD_HASH_TIMEOUT']
+        )
+        current_app.extensions['password_hasher'] = hasher
+    return hasher
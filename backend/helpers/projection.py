@@ -0,0 +1,34 @@
+from helpers.conditional import VALIDATOR_FIELDS
+
+# Fields clients may request with ?fields=a,b,c
+EVENT_FIELDS = ('title', 'description', 'date', 'time', 'location', 'venue', 'category', 'price',
+                'maxAttendees', 'image', 'status', 'registeredCount', 'seatShards', 'organizer_id',
+                'created_at', 'updated_at')
+USER_FIELDS = ('name', 'email', 'phone', 'created_at', 'updated_at')
+
+# Lean defaults for list views: everything an event card shows, no description
+EVENT_CARD_FIELDS = ('title', 'date', 'time', 'location', 'venue', 'category', 'price',
+                     'maxAttendees', 'image', 'status', 'registeredCount')
+
+
+def build_projection(fields, allowed, default=None, required=()):
+    # Turn a fields= parameter into a MongoDB projection; without one, use the
+    # endpoint's default (None means the whole document)
+    if fields:
+        names = [name.strip() for name in fields.split(',') if name.strip()]
+        unknown = sorted(set(names) - set(allowed) - {'_id'})
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    elif default is None:
+        return None
+    else:
+        names = default
+    projection = {name: 1 for name in names}
+    projection.update({name: 1 for name in required})
+    return projection
+
+
+def event_projection(fields, default=None):
+    # Validator fields always come back: they drive ETags, cursors and
+    # flash-sale seat counts
+    return build_projection(fields, EVENT_FIELDS, default, VALIDATOR_FIELDS)
@@ -0,0 +1,139 @@
+import json
+import threading
+from flask import request
+from pymongo import monitoring
+
+# Per-request MongoDB accounting. The listener is registered on the
+# MongoClient and hears every command; pymongo reports a command in the
+# thread that ran it, so a thread-local tells which request it belongs to.
+# Each request gets a Server-Timing header with its command count and DB time,
+# and commands slower than MONGO_SLOW_QUERY_MS are logged with the shape of
+# their filter (values replaced by '?'), so similar queries group together.
+
+# Where each command keeps the filter worth logging
+FILTER_FIELDS = {
+    'find': 'filter',
+    'count': 'query',
+    'distinct': 'query',
+    'findAndModify': 'query',
+    'delete': 'deletes',
+    'update': 'updates',
+}
+
+
+class RequestQueries:
+    __slots__ = ('commands', 'seconds', 'slowest', 'slowest_name')
+
+    def __init__(self):
+        self.commands = 0
+        self.seconds = 0.0
+        self.slowest = 0.0
+        self.slowest_name = None
+
+
+def query_shape(value):
+    # Keep field names and operators, drop the values
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = []
+        for item in value:
+            shape = query_shape(item)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    return '?'
+
+
+def command_shape(command_name, command):
+    if command_name == 'aggregate':
+        return [query_shape(stage) if '$match' in stage else next(iter(stage), '?')
+                for stage in command.get('pipeline', ())]
+    field = FILTER_FIELDS.get(command_name)
+    if field is None:
+        return None
+    value = command.get(field)
+    if field in ('deletes', 'updates'):
+        # Bulk statements: the filter of the first one
+        value = value[0].get('q') if value else None
+    return query_shape(value) if value is not None else None
+
+
+class QueryTracker(monitoring.CommandListener):
+
+    def __init__(self, slow_ms=100):
+        self.slow_ms = slow_ms
+        self._local = threading.local()
+
+    def begin(self, route):
+        self._local.queries = RequestQueries()
+        self._local.route = route
+
+    def end(self):
+        self._local.queries = None
+        self._local.route = None
+
+    def current(self):
+        return getattr(self._local, 'queries', None)
+
+    def started(self, event):
+        if self.slow_ms:
+            pending = getattr(self._local, 'pending', None)
+            if pending is None:
+                pending = self._local.pending = {}
+            # Keep the command until it finishes, in case it turns out slow
+            pending[event.request_id] = event.command
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event):
+        seconds = event.duration_micros / 1e6
+        queries = self.current()
+        if queries is not None:
+            queries.commands += 1
+            queries.seconds += seconds
+            if seconds > queries.slowest:
+                queries.slowest = seconds
+                queries.slowest_name = event.command_name
+
+        if not self.slow_ms:
+            return
+        pending = getattr(self._local, 'pending', None)
+        command = pending.pop(event.request_id, None) if pending else None
+        if command is not None and seconds * 1000 >= self.slow_ms:
+            collection = command.get(event.command_name)
+            shape = command_shape(event.command_name, command)
+            route = getattr(self._local, 'route', None) or '-'
+            print(f"Slow query: {event.database_name}.{collection} {event.command_name} "
+                  f"{seconds * 1000:.1f} ms route={route} shape={json.dumps(shape, default=str)}")
+
+
+query_tracker = QueryTracker()
+
+
+def register_query_tracking(app):
+    query_tracker.slow_ms = app.config['MONGO_SLOW_QUERY_MS']
+    server_timing = app.config['SERVER_TIMING']
+
+    @app.before_request
+    def begin_queries():
+        rule = request.url_rule
+        query_tracker.begin(rule.rule if rule else request.path)
+
+    @app.after_request
+    def add_server_timing(response):
+        queries = query_tracker.current()
+        if server_timing and queries is not None:
+            timing = f'db;desc="{queries.commands} queries";dur={queries.seconds * 1000:.2f}'
+            if queries.slowest_name:
+                timing += f', db-slowest;desc="{queries.slowest_name}";dur={queries.slowest * 1000:.2f}'
+            response.headers.add('Server-Timing', timing)
+        return response
+
+    @app.teardown_request
+    def end_queries(error=None):
+        query_tracker.end()
@@ -0,0 +1,195 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from flask import current_app, jsonify
+from pymongo.errors import DuplicateKeyError
+from helpers.deadline import outside_deadline
+
+# Revoked token ids (jti) are stored in MongoDB with a TTL matching the
+# token's expiry and mirrored in memory. A Bloom filter answers "not revoked"
+# for almost every token; its rare positives are settled by an exact set of
+# 64-bit fingerprints. A background thread pulls new revocations, so checks
+# never wait on the database.
+
+# Overlap for incremental refreshes, covering clock skew between workers
+REFRESH_OVERLAP = timedelta(seconds=5)
+# Newly seen fingerprints are merged into the sorted array past this size
+RECENT_LIMIT = 10000
+
+
+class BloomFilter:
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+def fingerprint(jti):
+    digest = hashlib.blake2b(jti.encode('utf-8'), digest_size=8, person=b'revoked').digest()
+    return int.from_bytes(digest, 'little')
+
+
+class RevocationList:
+
+    def __init__(self, collection, capacity, error_rate, refresh_interval, rebuild_interval):
+        self.collection = collection
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        # _lock guards the in-memory filter and fingerprints; _start_lock
+        # serialises the first load in a process
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._pid = None
+        self._bloom = None
+        self._fingerprints = array('Q')
+        self._recent = set()
+        self._last_sync = None
+        self._last_rebuild = 0.0
+        self.checks = 0
+        self.bloom_positives = 0
+
+    def _start(self):
+        # Load once per process (a forked worker rebuilds its own copy) and
+        # start the refresher; only the very first check waits for this. The
+        # load gets its own deadline, not what is left of the request that
+        # happened to trigger it
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            outside_deadline(self._rebuild)
+            self._pid = os.getpid()
+            thread = threading.Thread(target=self._refresh_loop, name='revocation-refresh', daemon=True)
+            thread.start()
+
+    def _rebuild(self):
+        # Full reload: drops tokens the TTL index has expired and resizes the
+        # filter if revocations outgrew it
+        started = datetime.utcnow()
+        docs = list(self.collection.find({}, {'_id': 1}))
+        capacity = self.capacity
+        while capacity < len(docs):
+            capacity *= 2
+        bloom = BloomFilter(capacity, self.error_rate)
+        for doc in docs:
+            bloom.add(doc['_id'])
+        fingerprints = array('Q', sorted({fingerprint(doc['_id']) for doc in docs}))
+        # Revocations remembered while this ran are picked up again by the
+        # next refresh, which starts from `started`
+        with self._lock:
+            self._bloom, self._fingerprints, self._recent = bloom, fingerprints, set()
+        self._last_sync = started
+        self._last_rebuild = time.monotonic()
+
+    def _refresh(self):
+        started = datetime.utcnow()
+        query = {'revoked_at': {'$gte': self._last_sync - REFRESH_OVERLAP}}
+        for doc in self.collection.find(query, {'_id': 1}):
+            self._remember(doc['_id'])
+        self._last_sync = started
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                if time.monotonic() - self._last_rebuild >= self.rebuild_interval:
+                    self._rebuild()
+                else:
+                    self._refresh()
+            except Exception as e:
+                print(f"Revocation list refresh failed: {e}")
+
+    def _remember(self, jti):
+        # Called from the refresher and from request threads; setting Bloom
+        # bits is a read-modify-write, so an unlocked call could lose one
+        with self._lock:
+            self._bloom.add(jti)
+            self._recent.add(fingerprint(jti))
+            if len(self._recent) > RECENT_LIMIT:
+                merged = set(self._fingerprints)
+                merged.update(self._recent)
+                self._fingerprints, self._recent = array('Q', sorted(merged)), set()
+
+    def is_revoked(self, jti):
+        if self._pid != os.getpid():
+            self._start()
+        self.checks += 1
+        if jti not in self._bloom:
+            return False
+        self.bloom_positives += 1
+        value = fingerprint(jti)
+        if value in self._recent:
+            return True
+        fingerprints = self._fingerprints
+        index = bisect_left(fingerprints, value)
+        return index < len(fingerprints) and fingerprints[index] == value
+
+    def revoke(self, jti, expires_at):
+        try:
+            self.collection.insert_one({
+                '_id': jti,
+                'expires_at': expires_at,
+                'revoked_at': datetime.utcnow()
+            })
+        except DuplicateKeyError:
+            pass
+        if self._pid == os.getpid():
+            self._remember(jti)
+
+    def stats(self):
+        return {
+            'revoked': len(self._fingerprints) + len(self._recent),
+            'bloom_bits': self._bloom.size if self._bloom else 0,
+            'bloom_hashes': self._bloom.hashes if self._bloom else 0,
+            'checks': self.checks,
+            'bloom_positives': self.bloom_positives
+        }
+
+
+def get_revocation_list():
+    revocations = current_app.extensions.get('revocation_list')
+    if revocations is None:
+        from models.collections import revoked_tokens_collection
+        config = current_app.config
+        revocations = RevocationList(
+            revoked_tokens_collection,
+            config['REVOCATION_BLOOM_CAPACITY'],
+            config['REVOCATION_BLOOM_ERROR_RATE'],
+            config['REVOCATION_REFRESH_INTERVAL'],
+            config['REVOCATION_REBUILD_INTERVAL']
+        )
+        current_app.extensions['revocation_list'] = revocations
+    return revocations
+
+
+def register_revocation_loaders(jwt):
+
+    @jwt.token_in_blocklist_loader
+    def is_token_revoked(jwt_header, jwt_payload):
+        return get_revocation_list().is_revoked(jwt_payload['jti'])
+
+    @jwt.revoked_token_loader
+    def revoked_token(jwt_header, jwt_payload):
+        return jsonify({'message': 'Token has been revoked'}), 401
@@ -0,0 +1,118 @@
+import random
+from pymongo import InsertOne
+from models.collections import seat_shards_collection
+
+# Flash-sale events split maxAttendees across several sub-counter documents so
+# concurrent registrations update different documents instead of one hot one.
+
+
+def parse_shard_count(value, maximum):
+    if value in (None, ''):
+        return 0
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('seatShards must be an integer')
+    if count < 0 or count > maximum:
+        raise ValueError(f'seatShards must be between 0 and {maximum}')
+    return count
+
+
+def is_sharded(event):
+    return (event.get('seatShards') or 0) > 1
+
+
+def split_capacity(total, shard_count):
+    base, extra = divmod(int(total), shard_count)
+    return [base + (1 if i < extra else 0) for i in range(shard_count)]
+
+
+def configure_shards(event_id, max_attendees, shard_count, registered=0):
+    # Rebuild the shard documents, filling the seats already taken in order.
+    # Seats taken beyond a reduced capacity stay on the last shard (used above
+    # capacity), so the totals never drop a registration and the freed seats
+    # aren't sold again. This is an organizer-side operation and is not safe
+    # against registrations that land while it runs; counters.py repairs any
+    # drift.
+    capacities = split_capacity(max_attendees, shard_count)
+    last = len(capacities) - 1
+    requests = []
+    for shard, capacity in enumerate(capacities):
+        used = registered if shard == last else min(capacity, registered)
+        registered -= used
+        requests.append(InsertOne({
+            'event_id': event_id,
+            'shard': shard,
+            'capacity': capacity,
+            'used': used
+        }))
+    seat_shards_collection.delete_many({'event_id': event_id})
+    seat_shards_collection.bulk_write(requests, ordered=False)
+
+
+def delete_shards(event_id):
+    seat_shards_collection.delete_many({'event_id': event_id})
+
+
+def claim_seat(event_id, shard_count):
+    # Start at a random shard to spread writes, then fall back to the others
+    # in turn; each claim is a conditional increment, so no shard oversells
+    start = random.randrange(shard_count)
+    for offset in range(shard_count):
+        shard = (start + offset) % shard_count
+        claimed = seat_shards_collection.find_one_and_update(
+            {
+                'event_id': event_id,
+                'shard': shard,
+                '$expr': {'$lt': ['$used', '$capacity']}
+            },
+            {'$inc': {'used': 1}},
+            projection={'_id': 1}
+        )
+        if claimed:
+            return shard
+    return None
+
+
+def release_seat(event_id, shard):
+    # Prefer the shard the seat came from; after a reshard it may already be
+    # empty, in which case any shard with a taken seat gives one back
+    for query in ({'event_id': event_id, 'shard': shard, 'used': {'$gt': 0}},
+                  {'event_id': event_id, 'used': {'$gt': 0}}):
+        result = seat_shards_collection.update_one(query, {'$inc': {'used': -1}})
+        if result.modified_count:
+            return
+
+
+def shard_totals_pipeline(event_ids):
+    return [
+        {'$match': {'event_id': {'$in': list(event_ids)}}},
+        {'$group': {'_id': '$event_id', 'used': {'$sum': '$used'}}}
+    ]
+
+
+def shard_totals(event_ids):
+    if not event_ids:
+        return {}
+    rows = seat_shards_collection.aggregate(shard_totals_pipeline(event_ids))
+    return {row['_id']: row['used'] for row in rows}
+
+
+def sharded_event_ids(events):
+    return [event['_id'] for event in events if is_sharded(event)]
+
+
+def apply_shard_totals(events, totals):
+    for event in events:
+        if is_sharded(event):
+            event['registeredCount'] = totals.get(event['_id'], 0)
+    return events
+
+
+def attach_shard_counts(events):
+    # registeredCount on a sharded event document is not maintained; derive
+    # it from the shards with one aggregation for the whole batch
+    event_ids = sharded_event_ids(events)
+    if not event_ids:
+        return events
+    return apply_shard_totals(events, shard_totals(event_ids))
@@ -1,18 +1,43 @@
+import json
 from bson import ObjectId
-from datetime import datetime
-
-def serialize_doc(doc):
-    if doc is None:
-        return None
-    doc['_id'] = str(doc['_id'])
-    for key, value in doc.items():
-        if isinstance(value, datetime):
-            doc[key] = value.isoformat()
-        elif isinstance(value, ObjectId):
-            doc[key] = str(value)
-        elif isinstance(value, dict):
-            doc[key] = serialize_doc(value)
-    return doc
-
-def serialize_docs(docs):
-    return [serialize_doc(doc) for doc in docs]
+from datetime import date, datetime
+from flask.json.provider import JSONProvider
+
+
+def encode_default(obj):
+    # Called by the C encoder only for values it can't handle natively, so
+    # documents are encoded in one pass without being copied or mutated
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+_encoder = json.JSONEncoder(default=encode_default, separators=(',', ':'))
+
+
+def dumps(obj):
+    return _encoder.encode(obj)
+
+
+def dumpb(obj):
+    return _encoder.encode(obj).encode('utf-8')
+
+
+class MongoJSONProvider(JSONProvider):
+    # Flask JSON provider that accepts raw PyMongo documents; keys keep
+    # their document order instead of being sorted
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            kwargs.setdefault('default', encode_default)
+            return json.dumps(obj, **kwargs)
+        return dumps(obj)
+
+    def loads(self, s, **kwargs):
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumpb(obj), mimetype='application/json')
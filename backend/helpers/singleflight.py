@@ -0,0 +1,85 @@
+import threading
+from flask import current_app
+
+# Request coalescing for hot reads. While one thread is fetching a key, other
+# threads asking for the same key wait for that fetch and share its result
+# (or its exception) instead of issuing their own MongoDB queries. Nothing is
+# kept once the fetch returns, so this never serves stale data.
+
+
+class _Call:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.collapsed = 0
+        self.errors = 0
+        self.max_waiters = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.collapsed += 1
+                self.max_waiters = max(self.max_waiters, call.waiters)
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'leaders': self.leaders,
+                'collapsed': self.collapsed,
+                'errors': self.errors,
+                'max_waiters': self.max_waiters
+            }
+
+
+def get_single_flight():
+    flight = current_app.extensions.get('single_flight')
+    if flight is None:
+        flight = SingleFlight()
+        current_app.extensions['single_flight'] = flight
+    return flight
+
+
+def coalesce(key, fn):
+    # Run fn once for all concurrent callers with the same key. Results are
+    # shared between requests, so callers must not mutate them.
+    if not current_app.config['SINGLE_FLIGHT_ENABLED']:
+        return fn()
+    return get_single_flight().do(key, fn)
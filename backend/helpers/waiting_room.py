@@ -0,0 +1,211 @@
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+from functools import wraps
+from flask import current_app, jsonify, request
+from pymongo.errors import DuplicateKeyError
+
+# Admission control for registration bursts. Requests are admitted at a steady
+# rate (token bucket); once the bucket is empty callers get a FIFO queue
+# ticket, poll their position, and retry with the ticket once admitted.
+
+Admission = namedtuple('Admission', ['admitted', 'ticket', 'position'])
+
+TICKET_HEADER = 'X-Queue-Ticket'
+
+
+def advance(state, now, rate, burst):
+    # Refill the bucket for the elapsed time and spend tokens on waiting
+    # tickets in order; tickets with seq < head are admitted
+    tokens = min(burst, state['tokens'] + max(0.0, now - state['stamp']) * rate)
+    head = state['head']
+    waiting = state['issued'] - head + 1
+    if waiting > 0 and tokens >= 1:
+        moved = min(waiting, int(tokens))
+        head += moved
+        tokens -= moved
+    return {'tokens': tokens, 'head': head, 'issued': state['issued'], 'stamp': now}
+
+
+def initial_state(burst, now):
+    return {'tokens': float(burst), 'head': 1, 'issued': 0, 'stamp': now}
+
+
+class InProcessWaitingRoom:
+    # Single-node backend: state and tickets live in this process
+
+    def __init__(self, rate, burst, ticket_ttl):
+        self.rate = rate
+        self.burst = burst
+        self.ticket_ttl = ticket_ttl
+        self._lock = threading.Lock()
+        self._state = initial_state(burst, time.monotonic())
+        self._tickets = OrderedDict()
+
+    def _expire(self, now):
+        while self._tickets:
+            ticket, (seq, issued_at) = next(iter(self._tickets.items()))
+            if now - issued_at < self.ticket_ttl:
+                break
+            self._tickets.pop(ticket)
+
+    def enter(self, ticket=None):
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            state = self._state = advance(self._state, now, self.rate, self.burst)
+
+            if ticket in self._tickets:
+                seq = self._tickets[ticket][0]
+                if seq < state['head']:
+                    self._tickets.pop(ticket)
+                    return Admission(True, None, 0)
+                return Admission(False, ticket, seq - state['head'] + 1)
+
+            # Nobody waiting and a token available: straight through
+            if state['issued'] < state['head'] and state['tokens'] >= 1:
+                state['tokens'] -= 1
+                return Admission(True, None, 0)
+
+            state['issued'] += 1
+            ticket = uuid.uuid4().hex
+            self._tickets[ticket] = (state['issued'], now)
+            return Admission(False, ticket, state['issued'] - state['head'] + 1)
+
+    def position(self, ticket):
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            self._state = advance(self._state, now, self.rate, self.burst)
+            if ticket not in self._tickets:
+                return None
+            seq = self._tickets[ticket][0]
+            if seq < self._state['head']:
+                return Admission(True, ticket, 0)
+            return Admission(False, ticket, seq - self._state['head'] + 1)
+
+
+class MongoWaitingRoom:
+    # Multi-worker backend: the bucket is one small document updated with
+    # optimistic concurrency, tickets are documents expired by a TTL index
+
+    STATE_ID = 'register'
+    MAX_RETRIES = 20
+
+    def __init__(self, rate, burst, ticket_ttl, state_collection, tickets_collection):
+        self.rate = rate
+        self.burst = burst
+        self.ticket_ttl = ticket_ttl
+        self.state_collection = state_collection
+        self.tickets_collection = tickets_collection
+
+    def _load(self, now):
+        state = self.state_collection.find_one({'_id': self.STATE_ID})
+        if state is None:
+            try:
+                state = {'_id': self.STATE_ID, **initial_state(self.burst, now)}
+                self.state_collection.insert_one(state)
+            except DuplicateKeyError:
+                state = self.state_collection.find_one({'_id': self.STATE_ID})
+        return state
+
+    def _commit(self, old, new):
+        result = self.state_collection.update_one(
+            {'_id': self.STATE_ID, 'stamp': old['stamp'], 'head': old['head'], 'issued': old['issued']},
+            {'$set': new}
+        )
+        return result.modified_count == 1
+
+    def enter(self, ticket=None):
+        seq = None
+        if ticket:
+            doc = self.tickets_collection.find_one({'_id': ticket})
+            seq = doc['seq'] if doc else None
+
+        for _ in range(self.MAX_RETRIES):
+            now = time.time()
+            old = self._load(now)
+            state = advance(old, now, self.rate, self.burst)
+
+            if seq is not None:
+                if seq >= state['head']:
+                    return Admission(False, ticket, seq - state['head'] + 1)
+                # Tickets are single use: only the caller that deletes it is admitted
+                if self.tickets_collection.delete_one({'_id': ticket}).deleted_count:
+                    return Admission(True, None, 0)
+                seq = None
+                continue
+
+            if state['issued'] < state['head'] and state['tokens'] >= 1:
+                state['tokens'] -= 1
+                if self._commit(old, state):
+                    return Admission(True, None, 0)
+                continue
+
+            state['issued'] += 1
+            if self._commit(old, state):
+                ticket = uuid.uuid4().hex
+                self.tickets_collection.insert_one({
+                    '_id': ticket,
+                    'seq': state['issued'],
+                    'created_at': datetime.utcnow()
+                })
+                return Admission(False, ticket, state['issued'] - state['head'] + 1)
+
+        # Heavy contention on the state document: ask the caller to retry
+        return Admission(False, None, None)
+
+    def position(self, ticket):
+        doc = self.tickets_collection.find_one({'_id': ticket})
+        if not doc:
+            return None
+        now = time.time()
+        state = advance(self._load(now), now, self.rate, self.burst)
+        if doc['seq'] < state['head']:
+            return Admission(True, ticket, 0)
+        return Admission(False, ticket, doc['seq'] - state['head'] + 1)
+
+
+def get_waiting_room():
+    room = current_app.extensions.get('waiting_room')
+    if room is None:
+        config = current_app.config
+        backend = config['WAITING_ROOM_BACKEND']
+        args = (config['WAITING_ROOM_RATE'], config['WAITING_ROOM_BURST'], config['WAITING_ROOM_TICKET_TTL'])
+        if backend == 'mongo':
+            from models.collections import waiting_room_collection, queue_tickets_collection
+            room = MongoWaitingRoom(*args, waiting_room_collection, queue_tickets_collection)
+        elif backend == 'memory':
+            room = InProcessWaitingRoom(*args)
+        else:
+            room = False
+        current_app.extensions['waiting_room'] = room
+    return room
+
+
+def retry_after(position):
+    rate = current_app.config['WAITING_ROOM_RATE']
+    return max(1, math.ceil((position or 1) / rate))
+
+
+def admission_control(view):
+    # Put the waiting room in front of a view; queued callers get 202 with a
+    # ticket to poll and to send back in the X-Queue-Ticket header
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        room = get_waiting_room()
+        if room:
+            admission = room.enter(request.headers.get(TICKET_HEADER))
+            if not admission.admitted:
+                response = jsonify({
+                    'message': 'You are in the queue, please wait',
+                    'ticket': admission.ticket,
+                    'position': admission.position
+                })
+                response.headers['Retry-After'] = str(retry_after(admission.position))
+                return response, 202
+        return view(*args, **kwargs)
+    return wrapper
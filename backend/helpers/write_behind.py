@@ -0,0 +1,233 @@
+import atexit
+import os
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from pymongo.errors import BulkWriteError, ConnectionFailure, PyMongoError
+
+# Write-behind buffer for fire-and-forget inserts such as contact submissions.
+# Requests append to an in-process list and return; a background thread writes
+# batches with insert_many once batch_size documents are waiting or every
+# flush_interval seconds. Whatever is still buffered is flushed at exit.
+# A document that keeps failing (invalid, unencodable) is retried at most
+# max_attempts times and then moved to the dead-letter collection, so it can't
+# hold up the documents behind it. Outages (network errors, timeouts) are
+# retried without counting against that limit.
+
+DUPLICATE_KEY = 11000
+
+# Dead letters keep the document as text, since it may not be encodable
+DEAD_LETTER_MAX_CHARS = 10000
+
+
+def is_transient(error):
+    return isinstance(error, ConnectionFailure) or (isinstance(error, PyMongoError) and error.timeout)
+
+
+class BufferedWriter:
+
+    def __init__(self, collection, batch_size=100, flush_interval=1.0, max_pending=10000,
+                 max_attempts=3, dead_letter=None):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.dead_letter = dead_letter
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._pending = []
+        self._pid = None
+        self._thread = None
+        self._closed = False
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self.dead_lettered = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._flush_ms_total = 0.0
+        atexit.register(self.close)
+
+    def _start(self):
+        # One flusher per process; a forked worker starts with an empty buffer
+        # and its own thread, the parent keeps flushing what it accepted
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._pending = []
+            self._closed = False
+            self._thread = threading.Thread(target=self._flush_loop, name='write-behind', daemon=True)
+            self._thread.start()
+
+    def submit(self, doc):
+        # False when the buffer is full or closed; the caller writes directly
+        if self._pid != os.getpid():
+            self._start()
+        with self._lock:
+            if self._closed or len(self._pending) >= self.max_pending:
+                self.rejected += 1
+                return False
+            # Each entry is [document, failed attempts]
+            self._pending.append([doc, 0])
+            self.accepted += 1
+            if len(self._pending) >= self.batch_size:
+                self._ready.notify()
+        return True
+
+    def _take_batch(self):
+        batch = self._pending[:self.batch_size]
+        del self._pending[:self.batch_size]
+        return batch
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                self._ready.wait_for(
+                    lambda: self._closed or len(self._pending) >= self.batch_size,
+                    timeout=self.flush_interval
+                )
+                if self._closed:
+                    return
+                batch = self._take_batch()
+            if batch and not self._write(batch):
+                time.sleep(self.flush_interval)
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        try:
+            self.collection.insert_many([doc for doc, _ in batch], ordered=False)
+        except BulkWriteError as e:
+            # A retried batch may be partly written already; anything other
+            # than duplicate _ids is a real failure, and only those documents
+            # are retried
+            failed = sorted({error['index'] for error in e.details.get('writeErrors', ())
+                             if error['code'] != DUPLICATE_KEY})
+            if failed:
+                self._record(len(batch) - len(failed), started)
+                return self._retry([batch[index] for index in failed], e)
+        except Exception as e:
+            if is_transient(e):
+                return self._requeue(batch, e)
+            if len(batch) > 1:
+                # One bad document fails the whole insert_many; write them
+                # one at a time so only that one is retried
+                results = [self._write([entry]) for entry in batch]
+                return all(results)
+            return self._retry(batch, e)
+
+        self._record(len(batch), started)
+        return True
+
+    def _record(self, written, started):
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.written += written
+            self.batches += 1
+            self.last_flush_ms = elapsed
+            self.max_flush_ms = max(self.max_flush_ms, elapsed)
+            self._flush_ms_total += elapsed
+
+    def _requeue(self, batch, error):
+        # Keep the batch at the front so it is retried before newer documents
+        print(f"Write-behind flush of {len(batch)} documents failed: {error}")
+        with self._lock:
+            self.failures += 1
+            self._pending[:0] = batch
+        return False
+
+    def _retry(self, batch, error):
+        # Count the failed attempt; documents out of attempts are dead-lettered
+        for entry in batch:
+            entry[1] += 1
+        exhausted = [entry for entry in batch if entry[1] >= self.max_attempts]
+        if exhausted:
+            self._dead_letter(exhausted, error)
+        remaining = [entry for entry in batch if entry[1] < self.max_attempts]
+        if remaining:
+            return self._requeue(remaining, error)
+        return False
+
+    def _dead_letter(self, entries, error):
+        print(f"Write-behind gave up on {len(entries)} documents after "
+              f"{self.max_attempts} attempts: {error}")
+        with self._lock:
+            self.dead_lettered += len(entries)
+        if self.dead_letter is None:
+            return
+        try:
+            self.dead_letter.insert_many([{
+                'document': repr(doc)[:DEAD_LETTER_MAX_CHARS],
+                'error': str(error)[:DEAD_LETTER_MAX_CHARS],
+                'attempts': attempts,
+                'failed_at': datetime.utcnow()
+            } for doc, attempts in entries])
+        except PyMongoError as e:
+            print(f"Write-behind could not store {len(entries)} dead letters: {e}")
+
+    def close(self):
+        # Stop accepting, let an in-flight batch finish, then flush the rest
+        # from the calling thread
+        if self._pid != os.getpid():
+            return
+        with self._lock:
+            self._closed = True
+            self._ready.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+        # A failing document is dead-lettered within max_attempts consecutive
+        # failures; more than that means MongoDB itself is unavailable
+        failures = 0
+        while True:
+            with self._lock:
+                batch = self._take_batch()
+            if not batch:
+                return
+            if self._write(batch):
+                failures = 0
+                continue
+            failures += 1
+            if failures > self.max_attempts:
+                print(f"Write-behind dropped {len(self._pending)} documents at shutdown")
+                return
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'max_pending': self.max_pending,
+                'accepted': self.accepted,
+                'rejected': self.rejected,
+                'written': self.written,
+                'batches': self.batches,
+                'failures': self.failures,
+                'dead_lettered': self.dead_lettered,
+                'last_flush_ms': round(self.last_flush_ms, 2),
+                'avg_flush_ms': round(self._flush_ms_total / self.batches, 2) if self.batches else 0.0,
+                'max_flush_ms': round(self.max_flush_ms, 2)
+            }
+
+
+def get_contact_writer():
+    writer = current_app.extensions.get('contact_writer')
+    if writer is None:
+        config = current_app.config
+        if config['CONTACT_WRITE_MODE'] == 'buffered':
+            from models.collections import contacts_collection, contacts_failed_collection
+            writer = BufferedWriter(
+                contacts_collection,
+                config['CONTACT_BATCH_SIZE'],
+                config['CONTACT_FLUSH_INTERVAL'],
+                config['CONTACT_MAX_PENDING'],
+                config['CONTACT_MAX_ATTEMPTS'],
+                contacts_failed_collection
+            )
+        else:
+            # 'sync': insert inside the request, e.g. for tests
+            writer = False
+        current_app.extensions['contact_writer'] = writer
+    return writer
@@ -0,0 +1,195 @@
+import argparse
+import sys
+from pymongo import ASCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+from config import Config
+from extensions import db
+
+# Declared indexes for every collection the routes query. ensure_indexes()
+# applies them idempotently; report_indexes() compares them with what exists.
+
+# Login and registration look users up by email; one account per address
+USER_INDEXES = [
+    IndexModel([('email', ASCENDING)], unique=True, name='email_unique'),
+]
+
+# Every catalog query filters on status and is sorted by the (date, _id)
+# keyset, so each compound index ends with those sort keys
+EVENT_INDEXES = [
+    IndexModel([('status', ASCENDING), ('date', ASCENDING), ('_id', ASCENDING)],
+               name='status_date'),
+    IndexModel([('status', ASCENDING), ('category', ASCENDING), ('date', ASCENDING), ('_id', ASCENDING)],
+               name='status_category_date'),
+    IndexModel([('status', ASCENDING), ('location', ASCENDING), ('date', ASCENDING), ('_id', ASCENDING)],
+               name='status_location_date'),
+    IndexModel([('status', ASCENDING), ('price', ASCENDING), ('date', ASCENDING), ('_id', ASCENDING)],
+               name='status_price_date'),
+    IndexModel([('title', TEXT), ('description', TEXT), ('location', TEXT)],
+               weights={'title': 10, 'location': 5, 'description': 1},
+               name='events_text'),
+    # Organizer dashboard: an organizer's events, newest first
+    IndexModel([('organizer_id', ASCENDING), ('created_at', ASCENDING)],
+               name='organizer_created'),
+]
+
+# One registration per user per event; also serves per-event lookups
+REGISTRATION_INDEXES = [
+    IndexModel([('event_id', ASCENDING), ('user_id', ASCENDING)],
+               unique=True, name='event_user_unique'),
+]
+
+# Flash-sale seat shards are addressed by (event_id, shard)
+SEAT_SHARD_INDEXES = [
+    IndexModel([('event_id', ASCENDING), ('shard', ASCENDING)],
+               unique=True, name='event_shard_unique'),
+]
+
+# Waiting room tickets expire on their own once abandoned
+QUEUE_TICKET_INDEXES = [
+    IndexModel([('created_at', ASCENDING)],
+               expireAfterSeconds=Config.WAITING_ROOM_TICKET_TTL, name='created_at_ttl'),
+]
+
+# Shared response cache entries expire at their own expires_at
+RESPONSE_CACHE_INDEXES = [
+    IndexModel([('expires_at', ASCENDING)], expireAfterSeconds=0, name='expires_at_ttl'),
+]
+
+# Revoked tokens disappear when the token would have expired; workers pull
+# new revocations by revoked_at
+REVOKED_TOKEN_INDEXES = [
+    IndexModel([('expires_at', ASCENDING)], expireAfterSeconds=0, name='expires_at_ttl'),
+    IndexModel([('revoked_at', ASCENDING)], name='revoked_at'),
+]
+
+# Runners claim the oldest due job, or a running one with a lapsed lease.
+# dedupe_key is unique while set (it is removed when a job finishes) and
+# finished jobs expire after JOBS_RETENTION
+JOB_INDEXES = [
+    IndexModel([('status', ASCENDING), ('run_at', ASCENDING)], name='status_run_at'),
+    IndexModel([('status', ASCENDING), ('lease_until', ASCENDING)], name='status_lease_until'),
+    IndexModel([('dedupe_key', ASCENDING)], unique=True,
+               partialFilterExpression={'dedupe_key': {'$type': 'string'}}, name='dedupe_key_unique'),
+    IndexModel([('finished_at', ASCENDING)],
+               expireAfterSeconds=Config.JOBS_RETENTION, name='finished_at_ttl'),
+]
+
+INDEXES = {
+    'users': USER_INDEXES,
+    'events': EVENT_INDEXES,
+    'registrations': REGISTRATION_INDEXES,
+    'seat_shards': SEAT_SHARD_INDEXES,
+    'queue_tickets': QUEUE_TICKET_INDEXES,
+    'response_cache': RESPONSE_CACHE_INDEXES,
+    'revoked_tokens': REVOKED_TOKEN_INDEXES,
+    'jobs': JOB_INDEXES,
+}
+
+# Indexes that enforce correctness rather than speed: without them a user can
+# register twice for an event or sign up twice with one email. The app refuses
+# to start, and the routes refuse to write, while any of these is missing
+REQUIRED_INDEXES = {
+    'users': ['email_unique'],
+    'registrations': ['event_user_unique'],
+}
+
+# Verified once per process; an index is not dropped by the app itself
+_present = set()
+
+
+def ensure_indexes():
+    # create_indexes is a no-op for indexes that already exist; a conflict on
+    # one collection (e.g. duplicate emails) doesn't stop the others
+    results = {}
+    for name, indexes in INDEXES.items():
+        try:
+            results[name] = {'created': db[name].create_indexes(indexes)}
+        except OperationFailure as e:
+            results[name] = {'error': str(e)}
+            if e.code == 11000:
+                results[name]['duplicates'] = {
+                    index.document['name']: find_duplicates(name, index)
+                    for index in indexes if index.document.get('unique')
+                }
+    return results
+
+
+def find_duplicates(name, index, limit=10):
+    # Key values held by more than one document, which block a unique index
+    # build; each row has the values, how many documents share them and a few
+    # of their _ids
+    keys = list(index.document['key'])
+    pipeline = []
+    if 'partialFilterExpression' in index.document:
+        pipeline.append({'$match': index.document['partialFilterExpression']})
+    pipeline += [
+        {'$group': {'_id': {key: f'${key}' for key in keys},
+                    'count': {'$sum': 1}, 'ids': {'$push': '$_id'}}},
+        {'$match': {'count': {'$gt': 1}}},
+        {'$sort': {'count': -1}},
+        {'$limit': limit},
+        {'$project': {'count': 1, 'ids': {'$slice': ['$ids', 5]}}},
+    ]
+    return list(db[name].aggregate(pipeline, allowDiskUse=True))
+
+
+def missing_required_indexes():
+    missing = []
+    for name, required in REQUIRED_INDEXES.items():
+        existing = db[name].index_information()
+        missing += [f'{name}.{index}' for index in required if index not in existing]
+    return missing
+
+
+def has_index(name, index):
+    # Whether a required index exists; a positive answer is cached so routes
+    # pay for the check once per process
+    if (name, index) in _present:
+        return True
+    if index in db[name].index_information():
+        _present.add((name, index))
+        return True
+    return False
+
+
+def report_indexes():
+    # Missing: declared but not built. Undeclared: built but not declared.
+    # Unused: no accesses since the server last started ($indexStats)
+    report = {}
+    for name, indexes in INDEXES.items():
+        declared = {index.document['name'] for index in indexes}
+        existing = set(db[name].index_information()) - {'_id_'}
+        usage = {row['name']: row['accesses']['ops']
+                 for row in db[name].aggregate([{'$indexStats': {}}])}
+        report[name] = {
+            'missing': sorted(declared - existing),
+            'undeclared': sorted(existing - declared),
+            'unused': sorted(index for index in existing if usage.get(index, 0) == 0)
+        }
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Apply or inspect the declared MongoDB indexes')
+    parser.add_argument('command', choices=['apply', 'report'])
+    args = parser.parse_args()
+
+    if args.command == 'apply':
+        failed = False
+        for name, result in ensure_indexes().items():
+            if 'error' not in result:
+                print(f"{name}: {', '.join(result['created'])}")
+                continue
+            failed = True
+            print(f"{name}: FAILED - {result['error']}")
+            for index, duplicates in result.get('duplicates', {}).items():
+                for row in duplicates:
+                    ids = ', '.join(str(_id) for _id in row['ids'])
+                    print(f"  {index}: {row['_id']} held by {row['count']} documents ({ids})")
+        if failed:
+            sys.exit(1)
+    else:
+        for name, result in report_indexes().items():
+            print(f"{name}:")
+            for key in ('missing', 'undeclared', 'unused'):
+                print(f"  {key}: {', '.join(result[key]) or '-'}")
@@ -3,4 +3,11 @@ from extensions import db
 users_collection = db.users
 events_collection = db.events
 contacts_collection = db.contacts
+contacts_failed_collection = db.contacts_failed
 registrations_collection = db.registrations
+seat_shards_collection = db.seat_shards
+waiting_room_collection = db.waiting_room
+queue_tickets_collection = db.queue_tickets
+response_cache_collection = db.response_cache
+revoked_tokens_collection = db.revoked_tokens
+jobs_collection = db.jobs
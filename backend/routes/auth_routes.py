@@ -1,10 +1,13 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
-from bson import ObjectId
+from flask_jwt_extended import create_access_token, jwt_required, current_user, get_jwt
+from datetime import datetime, timezone
+from pymongo.errors import DuplicateKeyError
 from models.collections import users_collection
-from helpers.serializer import serialize_doc
+from helpers.projection import USER_FIELDS, build_projection
+from helpers.passwords import HashingBusy, get_password_hasher
+from helpers.revocation import get_revocation_list
+from helpers.deadline import error_response
+from indexes import has_index
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
@@ -19,6 +22,10 @@ def register():
             if not data.get(field):
                 return jsonify({'message': f'{field} is required'}), 400
         
+        # Only the unique email index stops two accounts racing for one address
+        if not has_index('users', 'email_unique'):
+            return jsonify({'message': 'Registration is temporarily unavailable'}), 503
+        
         # Check if user already exists
         if users_collection.find_one({'email': data['email']}):
             return jsonify({'message': 'User already exists with this email'}), 400
@@ -28,12 +35,16 @@ def register():
             'name': data['name'],
             'email': data['email'],
             'phone': data.get('phone', ''),
-            'password': generate_password_hash(data['password']),
+            'password': get_password_hasher().hash(data['password']),
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow()
         }
         
-        result = users_collection.insert_one(user_data)
+        # The unique email index catches sign-ups racing past the check above
+        try:
+            result = users_collection.insert_one(user_data)
+        except DuplicateKeyError:
+            return jsonify({'message': 'User already exists with this email'}), 400
         
         # Create access token
         access_token = create_access_token(identity=str(result.inserted_id))
@@ -48,8 +59,12 @@ def register():
             'user': user_data
         }), 201
         
+    except HashingBusy:
+        response = jsonify({'message': 'Server is busy, please try again shortly'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
     except Exception as e:
-        return jsonify({'message': str(e)}), 500
+        return error_response(e)
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
@@ -61,15 +76,27 @@ def login():
         
         # Find user
         user = users_collection.find_one({'email': data['email']})
-        if not user or not check_password_hash(user['password'], data['password']):
+        hasher = get_password_hasher()
+        if not user or not hasher.verify(user['password'], data['password']):
             return jsonify({'message': 'Invalid email or password'}), 401
         
+        # Upgrade hashes made with an older method or cost while we have the
+        # password. The login is already verified, so a busy pool only
+        # postpones the upgrade to a later login
+        if hasher.needs_rehash(user['password']):
+            try:
+                users_collection.update_one(
+                    {'_id': user['_id']},
+                    {'$set': {'password': hasher.hash(data['password'])}}
+                )
+            except HashingBusy:
+                pass
+        
         # Create access token
         access_token = create_access_token(identity=str(user['_id']))
         
         # Return user data (without password)
         user.pop('password')
-        user = serialize_doc(user)
         
         return jsonify({
             'message': 'Login successful',
@@ -77,26 +104,39 @@ def login():
             'user': user
         }), 200
         
+    except HashingBusy:
+        response = jsonify({'message': 'Server is busy, please try again shortly'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
     except Exception as e:
-        return jsonify({'message': str(e)}), 500
+        return error_response(e)
 
 @auth_bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
     try:
-        user_id = get_jwt_identity()
-        user = users_collection.find_one({'_id': ObjectId(user_id)})
+        # current_user comes from the identity cache; fields= picks from it
+        projection = build_projection(request.args.get('fields'), USER_FIELDS, USER_FIELDS)
+        user = {'_id': current_user['_id']}
+        user.update({field: current_user[field] for field in projection if field in current_user})
         
-        if not user:
-            return jsonify({'message': 'User not found'}), 404
-        
-        user.pop('password')
-        return jsonify(serialize_doc(user)), 200
+        return jsonify(user), 200
         
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
-        return jsonify({'message': str(e)}), 500
+        return error_response(e)
 
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
-    return jsonify({'message': 'Logout successful'}), 200
+    try:
+        # Revoke this token until it would have expired anyway
+        token = get_jwt()
+        expires_at = datetime.fromtimestamp(token['exp'], timezone.utc).replace(tzinfo=None)
+        get_revocation_list().revoke(token['jti'], expires_at)
+        
+        return jsonify({'message': 'Logout successful'}), 200
+        
+    except Exception as e:
+        return error_response(e)
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime
 from models.collections import contacts_collection
+from helpers.write_behind import get_contact_writer
+from helpers.deadline import error_response
 
 contact_bp = Blueprint('contact', __name__, url_prefix='/api')
 
@@ -26,9 +28,15 @@ def submit_contact():
             'status': 'new'
         }
         
+        # Buffered mode queues the submission for a batched insert; a full
+        # buffer or sync mode writes it straight away
+        writer = get_contact_writer()
+        if writer and writer.submit(contact_data):
+            return jsonify({'message': 'Contact form received'}), 202
+        
         contacts_collection.insert_one(contact_data)
         
         return jsonify({'message': 'Contact form submitted successfully'}), 201
         
     except Exception as e:
-        return jsonify({'message': str(e)}), 500
+        return error_response(e)
@@ -1,34 +1,85 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from bson import ObjectId
 from datetime import datetime
+from pymongo.errors import DuplicateKeyError
 from models.collections import events_collection, registrations_collection
-from helpers.serializer import serialize_doc, serialize_docs
+from helpers.pagination import paginate
+from helpers.event_query import build_events_list_query, parse_number
+from helpers import seat_shards
+from helpers.waiting_room import admission_control, get_waiting_room
+from helpers.cache import cached_response, invalidate
+from helpers.projection import event_projection
+from helpers.singleflight import coalesce
+from helpers.jobs import enqueue
+from helpers.conditional import (VALIDATOR_FIELDS, add_validators, collection_validators,
+                                 document_validators, has_conditional_headers, not_modified)
+from helpers.deadline import error_response, outside_deadline
+from indexes import has_index
 
 event_bp = Blueprint('events', __name__, url_prefix='/api')
 
 @event_bp.route('/events', methods=['GET'])
+@cached_response('events')
 def get_events():
     try:
-        events = list(events_collection.find({'status': 'published'}).sort('date', 1))
-        return jsonify({'events': serialize_docs(events)}), 200
+        query, projection, limit = build_events_list_query(
+            request.args,
+            current_app.config['EVENTS_PAGE_SIZE'],
+            current_app.config['EVENTS_MAX_PAGE_SIZE']
+        )
+        
+        # Revalidation: probe only the validator fields of this page first
+        if has_conditional_headers(collection=True):
+            probe, probe_cursor = paginate(events_collection.find(query, VALIDATOR_FIELDS), limit)
+            seat_shards.attach_shard_counts(probe)
+            response = not_modified(*collection_validators(probe, probe_cursor))
+            if response:
+                return response
+        
+        events, next_cursor = paginate(events_collection.find(query, projection), limit)
+        seat_shards.attach_shard_counts(events)
+        etag, last_modified = collection_validators(events, next_cursor)
+        
+        response = jsonify({'events': events, 'next_cursor': next_cursor})
+        return add_validators(response, etag, last_modified), 200
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
-        return jsonify({'message': str(e)}), 500
+        return error_response(e)
 
 @event_bp.route('/events/<event_id>', methods=['GET'])
+@cached_response('event:{event_id}')
 def get_event(event_id):
     try:
-        event = events_collection.find_one({'_id': ObjectId(event_id)})
+        event_oid = ObjectId(event_id)
+        projection = event_projection(request.args.get('fields'))
+        
+        def fetch_event():
+            event = events_collection.find_one({'_id': event_oid}, projection)
+            if event:
+                # Registration count is kept on the event document, or on its
+                # seat shards for flash-sale events
+                event.setdefault('registeredCount', 0)
+                seat_shards.attach_shard_counts([event])
+            return event
+        
+        # Concurrent reads of the same event and fields share one fetch
+        fields_key = ','.join(sorted(projection)) if projection else '*'
+        event = coalesce(f'event:{event_id}|{fields_key}', fetch_event)
         if not event:
             return jsonify({'message': 'Event not found'}), 404
         
-        # Get registration count
-        registration_count = registrations_collection.count_documents({'event_id': ObjectId(event_id)})
-        event['registeredCount'] = registration_count
+        etag, last_modified = document_validators([event])
+        response = not_modified(etag, last_modified)
+        if response:
+            return response
         
-        return jsonify({'event': serialize_doc(event)}), 200
+        return add_validators(jsonify({'event': event}), etag, last_modified), 200
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
-        return jsonify({'message': str(e)}), 500
+        return error_response(e)
 
 @event_bp.route('/events', methods=['POST'])
 @jwt_required()
@@ -51,26 +102,36 @@ def create_event():
             'location': data['location'],
             'venue': data.get('venue', ''),
             'category': data.get('category', 'Event'),
-            'price': data.get('price', 0),
-            'maxAttendees': data.get('maxAttendees', 100),
+            'price': parse_number(data.get('price'), 'price') or 0,
+            'maxAttendees': parse_number(data.get('maxAttendees'), 'maxAttendees') or 100,
             'image': data.get('image', ''),
             'status': data.get('status', 'draft'),
+            'registeredCount': 0,
+            'seatShards': seat_shards.parse_shard_count(
+                data.get('seatShards'), current_app.config['FLASH_SALE_MAX_SHARDS']
+            ),
             'organizer_id': ObjectId(user_id),
             'created_at': datetime.utcnow(),
             'updated_at': datetime.utcnow()
         }
         
         result = events_collection.insert_one(event_data)
-        event_data['_id'] = str(result.inserted_id)
-        event_data['organizer_id'] = str(event_data['organizer_id'])
+        
+        # Flash-sale mode: spread capacity across seat shard documents
+        if seat_shards.is_sharded(event_data):
+            seat_shards.configure_shards(result.inserted_id, event_data['maxAttendees'], event_data['seatShards'])
+        
+        invalidate('events')
         
         return jsonify({
             'message': 'Event created successfully',
             'event': event_data
         }), 201
         
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
-        return jsonify({'message': str(e)}), 500
+        return error_response(e)
 
 @event_bp.route('/events/<event_id>', methods=['PUT'])
 @jwt_required()
@@ -95,20 +156,64 @@ def update_event(event_id):
         
         # Update only provided fields
         allowed_fields = ['title', 'description', 'date', 'time', 'location', 'venue', 
-                         'category', 'price', 'maxAttendees', 'image', 'status']
+                         'category', 'price', 'maxAttendees', 'image', 'status', 'seatShards']
         for field in allowed_fields:
             if field in data:
                 update_data[field] = data[field]
         
+        # Keep price and capacity numeric for range filters and seat checks
+        if 'price' in update_data:
+            update_data['price'] = parse_number(update_data['price'], 'price') or 0
+        if 'maxAttendees' in update_data:
+            update_data['maxAttendees'] = parse_number(update_data['maxAttendees'], 'maxAttendees') or 100
+        if 'seatShards' in update_data:
+            update_data['seatShards'] = seat_shards.parse_shard_count(
+                update_data['seatShards'], current_app.config['FLASH_SALE_MAX_SHARDS']
+            )
+        
+        # Switching flash-sale mode or resizing a sharded event moves the
+        # seat count between the event document and its shards. The edit form
+        # sends every field, so compare with the stored values rather than
+        # rebuilding the shards on each save
+        was_sharded = seat_shards.is_sharded(event)
+        now_sharded = seat_shards.is_sharded({**event, **update_data})
+        stored_shards = event.get('seatShards') or 0
+        stored_max = event.get('maxAttendees', 100)
+        resized = (update_data.get('seatShards', stored_shards) != stored_shards
+                   or update_data.get('maxAttendees', stored_max) != stored_max)
+        registered = None
+        if resized and (was_sharded or now_sharded):
+            if was_sharded:
+                registered = seat_shards.shard_totals([event['_id']]).get(event['_id'], 0)
+            else:
+                registered = event.get('registeredCount', 0)
+            if not now_sharded:
+                update_data['registeredCount'] = registered
+        
         events_collection.update_one(
             {'_id': ObjectId(event_id)},
             {'$set': update_data}
         )
         
+        if registered is not None:
+            if now_sharded:
+                seat_shards.configure_shards(
+                    event['_id'],
+                    update_data.get('maxAttendees', event.get('maxAttendees', 100)),
+                    update_data.get('seatShards', event.get('seatShards')),
+                    registered
+                )
+            else:
+                seat_shards.delete_shards(event['_id'])
+        
+        invalidate('events', f'event:{event_id}')
+        
         return jsonify({'message': 'Event updated successfully'}), 200
         
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
-        return jsonify({'message': str(e)}), 500
+        return error_response(e)
 
 @event_bp.route('/events/<event_id>', methods=['DELETE'])
 @jwt_required()
@@ -125,50 +230,146 @@ def delete_event(event_id):
         if result.deleted_count == 0:
             return jsonify({'message': 'Event not found or unauthorized'}), 404
         
-        # Also delete related registrations
-        registrations_collection.delete_many({'event_id': ObjectId(event_id)})
+        # Related registrations and seat shards are removed by a background
+        # job; the registeredCount counter was on the event document and is
+        # gone with it
+        enqueue('delete_event_cascade', {'event_id': event_id}, dedupe_key=f'delete_event:{event_id}')
+        
+        invalidate('events', f'event:{event_id}')
         
         return jsonify({'message': 'Event deleted successfully'}), 200
         
     except Exception as e:
-        return jsonify({'message': str(e)}), 500
+        return error_response(e)
 
 @event_bp.route('/events/<event_id>/register', methods=['POST'])
 @jwt_required()
+@admission_control
 def register_for_event(event_id):
     try:
         user_id = get_jwt_identity()
         
-        # Check if event exists
-        event = events_collection.find_one({'_id': ObjectId(event_id)})
-        if not event:
-            return jsonify({'message': 'Event not found'}), 404
+        event_oid = ObjectId(event_id)
+        user_oid = ObjectId(user_id)
         
-        # Check if user already registered
-        existing_registration = registrations_collection.find_one({
-            'event_id': ObjectId(event_id),
-            'user_id': ObjectId(user_id)
-        })
+        # Only the unique (event_id, user_id) index stops a second registration
+        if not has_index('registrations', 'event_user_unique'):
+            return jsonify({'message': 'Registration is temporarily unavailable'}), 503
         
-        if existing_registration:
-            return jsonify({'message': 'Already registered for this event'}), 400
+        # Claim a seat atomically: the filter only matches while seats remain,
+        # so concurrent registrations can never push the count past capacity
+        event = events_collection.find_one_and_update(
+            {
+                '_id': event_oid,
+                'seatShards': {'$not': {'$gt': 1}},
+                '$expr': {'$lt': [
+                    {'$ifNull': ['$registeredCount', 0]},
+                    {'$ifNull': ['$maxAttendees', 100]}
+                ]}
+            },
+            {'$inc': {'registeredCount': 1}, '$set': {'updated_at': datetime.utcnow()}},
+            projection={'_id': 1}
+        )
         
-        # Check if event is full
-        registration_count = registrations_collection.count_documents({'event_id': ObjectId(event_id)})
-        if registration_count >= event.get('maxAttendees', 100):
-            return jsonify({'message': 'Event is full'}), 400
+        shard = None
+        if not event:
+            # Slow path only: flash-sale event, or work out why no seat was claimed
+            event = events_collection.find_one({'_id': event_oid}, {'seatShards': 1})
+            if not event:
+                return jsonify({'message': 'Event not found'}), 404
+            if seat_shards.is_sharded(event):
+                shard = seat_shards.claim_seat(event_oid, event['seatShards'])
+            if shard is None:
+                if registrations_collection.find_one({'event_id': event_oid, 'user_id': user_oid}, {'_id': 1}):
+                    return jsonify({'message': 'Already registered for this event'}), 400
+                return jsonify({'message': 'Event is full'}), 400
         
-        # Create registration
+        def release_seat():
+            # Runs even when the request deadline has already run out, so a
+            # timed-out insert never keeps the seat
+            if shard is None:
+                outside_deadline(events_collection.update_one,
+                                 {'_id': event_oid}, {'$inc': {'registeredCount': -1}})
+            else:
+                outside_deadline(seat_shards.release_seat, event_oid, shard)
+        
+        # Create registration; the unique (event_id, user_id) index rejects duplicates
         registration_data = {
-            'event_id': ObjectId(event_id),
-            'user_id': ObjectId(user_id),
+            'event_id': event_oid,
+            'user_id': user_oid,
             'registered_at': datetime.utcnow(),
             'status': 'confirmed'
         }
+        if shard is not None:
+            registration_data['shard'] = shard
         
-        registrations_collection.insert_one(registration_data)
+        try:
+            registrations_collection.insert_one(registration_data)
+        except DuplicateKeyError:
+            release_seat()
+            return jsonify({'message': 'Already registered for this event'}), 400
+        except Exception:
+            # Give the seat back before reporting the failure
+            release_seat()
+            raise
+        
+        invalidate('events', f'event:{event_id}')
         
         return jsonify({'message': 'Successfully registered for event'}), 201
         
     except Exception as e:
-        return jsonify({'message': str(e)}), 500
+        return error_response(e)
+
+@event_bp.route('/events/<event_id>/register', methods=['DELETE'])
+@jwt_required()
+def cancel_registration(event_id):
+    try:
+        user_id = get_jwt_identity()
+        
+        registration = registrations_collection.find_one_and_delete({
+            'event_id': ObjectId(event_id),
+            'user_id': ObjectId(user_id)
+        })
+        
+        if not registration:
+            return jsonify({'message': 'Registration not found'}), 404
+        
+        # Give the seat back to wherever the event counts seats now: the
+        # organizer may have switched flash-sale mode since this registration
+        # was made, which moves the count between the event and its shards.
+        # The registration is already gone, so this runs even if the request
+        # deadline ran out meanwhile
+        event_oid = ObjectId(event_id)
+        event = outside_deadline(events_collection.find_one, {'_id': event_oid}, {'seatShards': 1})
+        if event and seat_shards.is_sharded(event):
+            outside_deadline(seat_shards.release_seat, event_oid, registration.get('shard', 0))
+        elif event:
+            outside_deadline(
+                events_collection.update_one,
+                {'_id': event_oid, 'registeredCount': {'$gt': 0}},
+                {'$inc': {'registeredCount': -1}, '$set': {'updated_at': datetime.utcnow()}}
+            )
+        
+        invalidate('events', f'event:{event_id}')
+        
+        return jsonify({'message': 'Registration cancelled successfully'}), 200
+        
+    except Exception as e:
+        return error_response(e)
+
+@event_bp.route('/queue/<ticket>', methods=['GET'])
+def get_queue_position(ticket):
+    try:
+        room = get_waiting_room()
+        admission = room.position(ticket) if room else None
+        if not admission:
+            return jsonify({'message': 'Ticket not found or expired'}), 404
+        
+        return jsonify({
+            'ticket': admission.ticket,
+            'admitted': admission.admitted,
+            'position': admission.position
+        }), 200
+        
+    except Exception as e:
+        return error_response(e)
@@ -2,8 +2,13 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from bson import ObjectId
 from datetime import datetime
-from models.collections import users_collection, events_collection, registrations_collection
-from helpers.serializer import serialize_docs
+from models.collections import users_collection, events_collection
+from helpers.seat_shards import attach_shard_counts
+from helpers.projection import EVENT_CARD_FIELDS, event_projection
+from helpers.identity import invalidate_user
+from helpers.conditional import (VALIDATOR_FIELDS, add_validators, collection_validators,
+                                 has_conditional_headers, not_modified)
+from helpers.deadline import error_response
 
 user_bp = Blueprint('user', __name__, url_prefix='/api/user')
 
@@ -13,18 +18,33 @@ def get_user_events():
     try:
         user_id = get_jwt_identity()
         
+        query = {'organizer_id': ObjectId(user_id)}
+        projection = event_projection(request.args.get('fields'), EVENT_CARD_FIELDS)
+        
+        # Revalidation: compare validator fields before fetching full documents
+        if has_conditional_headers(collection=True):
+            probe = list(events_collection.find(query, VALIDATOR_FIELDS).sort('created_at', -1))
+            attach_shard_counts(probe)
+            response = not_modified(*collection_validators(probe, user_id), private=True)
+            if response:
+                return response
+        
         # Get events created by user
-        events = list(events_collection.find({'organizer_id': ObjectId(user_id)}).sort('created_at', -1))
+        events = list(events_collection.find(query, projection).sort('created_at', -1))
         
-        # Add registration count to each event
+        # Registration counts are kept on each event document
         for event in events:
-            registration_count = registrations_collection.count_documents({'event_id': event['_id']})
-            event['registeredCount'] = registration_count
+            event.setdefault('registeredCount', 0)
+        attach_shard_counts(events)
+        etag, last_modified = collection_validators(events, user_id)
         
-        return jsonify({'events': serialize_docs(events)}), 200
+        response = jsonify({'events': events})
+        return add_validators(response, etag, last_modified, private=True), 200
         
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
-        return jsonify({'message': str(e)}), 500
+        return error_response(e)
 
 @user_bp.route('/profile', methods=['PUT'])
 @jwt_required()
@@ -47,8 +67,9 @@ def update_profile():
             {'_id': ObjectId(user_id)},
             {'$set': update_data}
         )
+        invalidate_user(user_id)
         
         return jsonify({'message': 'Profile updated successfully'}), 200
         
     except Exception as e:
-        return jsonify({'message': str(e)}), 500
+        return error_response(e)
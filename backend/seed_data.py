@@ -1,16 +1,10 @@
-from pymongo import MongoClient
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash
-import os
-from dotenv import load_dotenv
+from extensions import db
+from indexes import ensure_indexes
 
-# Load environment variables
-load_dotenv()
-
-# MongoDB connection
-MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/eventpro')
-client = MongoClient(MONGO_URI)
-db = client.eventpro
+# MongoDB connection: the app's own (MONGO_URI, MONGO_DB_NAME), so the seeded
+# data lands in the database ensure_indexes() builds indexes in
 
 # Clear existing data
 print("Clearing existing data...")
@@ -19,6 +13,12 @@ db.events.delete_many({})
 db.contacts.delete_many({})
 db.registrations.delete_many({})
 
+# Make sure the declared indexes exist before inserting
+print("Applying indexes...")
+for name, result in ensure_indexes().items():
+    if 'error' in result:
+        print(f"  {name}: {result['error']}")
+
 # Create sample users
 print("Creating sample users...")
 users = [
@@ -186,6 +186,14 @@ registrations = [
 
 db.registrations.insert_many(registrations)
 
+# Set the denormalized registeredCount on each event
+print("Updating registration counters...")
+for event_id in event_ids:
+    db.events.update_one(
+        {'_id': event_id},
+        {'$set': {'registeredCount': db.registrations.count_documents({'event_id': event_id})}}
+    )
+
 print("Sample data created successfully!")
 print("\nSample login credentials:")
 print("Email: admin@eventpro.com, Password: admin123")
@@ -0,0 +1,34 @@
+from bson import ObjectId
+from helpers.jobs import job
+from helpers import seat_shards
+from models.collections import events_collection, registrations_collection
+from counters import reconcile_registration_counts
+
+# Background job handlers. Each one must be safe to run again after a partial
+# run: a job is retried when it raises or when its worker dies mid-run.
+
+BATCH_SIZE = 1000
+
+
+@job('delete_event_cascade')
+def delete_event_cascade(payload):
+    # Remove a deleted event's registrations and seat shards. Deleting in
+    # batches keeps each operation short on events with many registrations.
+    event_id = ObjectId(payload['event_id'])
+    if events_collection.find_one({'_id': event_id}, {'_id': 1}):
+        return {'registrations': 0, 'skipped': 'event exists'}
+
+    deleted = 0
+    while True:
+        ids = [doc['_id'] for doc in
+               registrations_collection.find({'event_id': event_id}, {'_id': 1}).limit(BATCH_SIZE)]
+        if not ids:
+            break
+        deleted += registrations_collection.delete_many({'_id': {'$in': ids}}).deleted_count
+    seat_shards.delete_shards(event_id)
+    return {'registrations': deleted}
+
+
+@job('reconcile_registration_counts')
+def reconcile_counts(payload):
+    return reconcile_registration_counts(dry_run=payload.get('dry_run', False))
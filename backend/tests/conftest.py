@@ -0,0 +1,73 @@
+import os
+import sys
+
+# The suite needs a MongoDB server (MONGO_URI) and works in its own database,
+# which is emptied before each test and dropped at the end. Without a server
+# every test is skipped.
+os.environ['MONGO_DB_NAME'] = os.getenv('TEST_MONGO_DB_NAME', 'eventpro_test')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pymongo
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from config import Config
+from extensions import mongo
+from indexes import ensure_indexes
+
+
+class TestConfig(Config):
+    TESTING = True
+    CREATE_INDEXES_ON_STARTUP = False
+    MIGRATE_ON_STARTUP = False
+    RESPONSE_CACHE_BACKEND = 'off'
+    CONTACT_WRITE_MODE = 'sync'
+    JOBS_MODE = 'inline'
+    LOAD_SHEDDING_ENABLED = False
+    PASSWORD_HASH_WORKERS = 0
+    WAITING_ROOM_BURST = 1000000
+
+
+@pytest.fixture(scope='session')
+def app():
+    try:
+        with pymongo.timeout(2):
+            mongo.client.admin.command('ping')
+    except pymongo.errors.PyMongoError as e:
+        pytest.skip(f'MongoDB is not available: {e}')
+
+    # Before create_app, which checks for the required unique indexes
+    for name, result in ensure_indexes().items():
+        assert 'error' not in result, f"{name}: {result['error']}"
+    app = create_app(TestConfig)
+    yield app
+    mongo.client.drop_database(mongo.database_name)
+
+
+@pytest.fixture
+def db(app):
+    # Empty every collection but keep the indexes
+    database = mongo.database
+    for name in database.list_collection_names():
+        database[name].delete_many({})
+    return database
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app, db):
+    # Insert a user and return (user_id, auth headers)
+    def make(name='Test User', email=None):
+        user_id = db.users.insert_one({
+            'name': name,
+            'email': email or f'{name.lower().replace(" ", ".")}.{os.urandom(4).hex()}@example.com',
+            'password': 'unused'
+        }).inserted_id
+        with app.app_context():
+            token = create_access_token(identity=str(user_id))
+        return user_id, {'Authorization': f'Bearer {token}'}
+    return make
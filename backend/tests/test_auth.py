@@ -0,0 +1,30 @@
+import pytest
+from werkzeug.security import generate_password_hash
+from helpers.passwords import HashingBusy, get_password_hasher, method_prefix
+
+
+@pytest.mark.parametrize('method', ['pbkdf2', 'pbkdf2:sha256', 'pbkdf2:sha512:1000',
+                                    'scrypt', 'scrypt:16384:8:1'])
+def test_method_prefix_matches_werkzeug(method):
+    assert method_prefix(method) == generate_password_hash('', method).split('$', 1)[0]
+
+
+def test_login_survives_busy_rehash(app, client, db, monkeypatch):
+    old_hash = generate_password_hash('secret', 'pbkdf2:sha256:1000')
+    db.users.insert_one({'name': 'Old Account', 'email': 'old@example.com', 'password': old_hash})
+    credentials = {'email': 'old@example.com', 'password': 'secret'}
+    with app.app_context():
+        hasher = get_password_hasher()
+
+    def busy(password):
+        raise HashingBusy('Too many password operations in progress')
+
+    # The upgrade is skipped, not the login
+    with monkeypatch.context() as patch:
+        patch.setattr(hasher, 'hash', busy)
+        assert client.post('/api/auth/login', json=credentials).status_code == 200
+    assert db.users.find_one({'email': 'old@example.com'})['password'] == old_hash
+
+    assert client.post('/api/auth/login', json=credentials).status_code == 200
+    upgraded = db.users.find_one({'email': 'old@example.com'})['password']
+    assert upgraded.startswith(method_prefix(app.config['PASSWORD_HASH_METHOD']) + '$')
@@ -0,0 +1,130 @@
+import threading
+import pytest
+from flask import Flask
+from config import Config
+from helpers.concurrency import BACKOFF, AIMDLimiter, register_load_shedding
+
+FAST = 0.01
+SLOW = 1.0
+
+
+def make_limiter(max_limit=10):
+    return AIMDLimiter(max_limit, latency_target=0.5)
+
+
+def hold(limiter, count):
+    assert all(limiter.acquire() for _ in range(count))
+
+
+def test_requests_over_the_limit_are_rejected():
+    limiter = make_limiter(3)
+    hold(limiter, 3)
+
+    assert not limiter.acquire()
+    limiter.release(FAST)
+    assert limiter.acquire()
+    assert limiter.stats()['accepted'] == 4 and limiter.stats()['rejected'] == 1
+
+
+@pytest.mark.parametrize('latency, failed', [(SLOW, False), (FAST, True)], ids=['slow', 'failed'])
+def test_slow_or_failed_request_cuts_the_limit(latency, failed):
+    limiter = make_limiter(10)
+    hold(limiter, 1)
+
+    limiter.release(latency, failed)
+
+    assert limiter.limit == pytest.approx(10 * BACKOFF)
+    assert limiter.stats()['limit'] == 9 and limiter.stats()['decreases'] == 1
+
+
+def test_limit_never_drops_below_the_minimum():
+    limiter = make_limiter(10)
+    for _ in range(100):
+        hold(limiter, 1)
+        limiter.release(SLOW)
+
+    assert limiter.stats()['limit'] == 1
+    assert limiter.acquire()
+
+
+def test_fast_requests_grow_the_limit_back_up_to_the_maximum():
+    limiter = make_limiter(10)
+    hold(limiter, 1)
+    limiter.release(SLOW)
+    assert limiter.stats()['limit'] == 9
+
+    # Keep the limit busy so fast completions count as demand; each adds
+    # 1/limit, so about one window of completions adds one
+    hold(limiter, 8)
+    for _ in range(10):
+        hold(limiter, 1)
+        limiter.release(FAST)
+    assert limiter.stats()['limit'] == 10
+
+    for _ in range(50):
+        hold(limiter, 1)
+        limiter.release(FAST)
+    assert limiter.limit == 10
+
+
+def test_idle_limit_does_not_grow():
+    limiter = make_limiter(10)
+    hold(limiter, 1)
+    limiter.release(SLOW)
+
+    for _ in range(100):
+        hold(limiter, 1)
+        limiter.release(FAST)
+
+    assert limiter.limit == pytest.approx(10 * BACKOFF)
+
+
+@pytest.fixture
+def shed_app():
+    # A bare app with only the shedding hooks: reads are limited to one at a time
+    app = Flask('shedding_test')
+    app.config.from_object(Config)
+    app.config.update(LOAD_SHEDDING_ENABLED=True, CONCURRENCY_READ_LIMIT=1, QUERY_RETRY_AFTER=2)
+    entered, release = threading.Event(), threading.Event()
+
+    @app.route('/slow')
+    def slow():
+        entered.set()
+        release.wait(5)
+        return 'done'
+
+    @app.route('/boom', methods=['POST'])
+    def boom():
+        return 'error', 500
+
+    register_load_shedding(app)
+    app.entered, app.release = entered, release
+    return app
+
+
+def test_request_over_its_class_limit_gets_503(shed_app):
+    limiter = shed_app.extensions['load_shedder'].limiters['read']
+    worker = threading.Thread(target=lambda: shed_app.test_client().get('/slow'))
+    worker.start()
+    try:
+        assert shed_app.entered.wait(5)
+        response = shed_app.test_client().get('/slow')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '2'
+        # Writes have their own budget
+        assert shed_app.test_client().post('/boom').status_code == 500
+    finally:
+        shed_app.release.set()
+        worker.join()
+
+    assert limiter.stats()['in_flight'] == 0 and limiter.stats()['rejected'] == 1
+
+
+def test_server_errors_back_off_the_class_limit(shed_app):
+    limiter = shed_app.extensions['load_shedder'].limiters['write']
+    before = limiter.limit
+
+    assert shed_app.test_client().post('/boom').status_code == 500
+
+    assert limiter.limit == pytest.approx(before * BACKOFF)
+    assert limiter.stats()['in_flight'] == 0
@@ -0,0 +1,34 @@
+from datetime import datetime
+from counters import reconcile_registration_counts, repair_counter
+
+
+def add_event(db, registered, registrations):
+    event_id = db.events.insert_one({
+        'title': 'Drifted', 'date': '2026-09-01', 'status': 'published',
+        'maxAttendees': 50, 'registeredCount': registered, 'updated_at': datetime.utcnow()
+    }).inserted_id
+    db.registrations.insert_many([{'event_id': event_id, 'user_id': i} for i in range(registrations)])
+    return event_id
+
+
+def test_reconcile_repairs_drifted_counters(db):
+    drifted = add_event(db, 7, 3)
+    correct = add_event(db, 2, 2)
+
+    assert reconcile_registration_counts(dry_run=True) == {'checked': 2, 'repaired': 1}
+    assert db.events.find_one({'_id': drifted})['registeredCount'] == 7
+
+    assert reconcile_registration_counts() == {'checked': 2, 'repaired': 1}
+    assert db.events.find_one({'_id': drifted})['registeredCount'] == 3
+    assert db.events.find_one({'_id': correct})['registeredCount'] == 2
+
+
+def test_repair_skips_counter_that_moved_since_the_scan(db):
+    event_id = add_event(db, 5, 3)
+
+    # The scan saw a drift of 1 but the counter has moved since; the repair
+    # leaves it for the next run instead of writing a stale value
+    assert not repair_counter(event_id, 1)
+    assert db.events.find_one({'_id': event_id})['registeredCount'] == 5
+    assert repair_counter(event_id, 2)
+    assert db.events.find_one({'_id': event_id})['registeredCount'] == 3
@@ -0,0 +1,81 @@
+from datetime import datetime
+from itertools import combinations
+import pytest
+from werkzeug.datastructures import MultiDict
+from helpers.event_query import build_events_list_query, parse_number
+from helpers.pagination import page_cursor
+
+# Every supported filter combination on GET /api/events must be answered from
+# an index. Ranges are tried as a pair, the way the catalog sends them.
+FILTER_GROUPS = {
+    'q': {'q': 'jazz'},
+    'category': {'category': 'Music'},
+    'location': {'location': 'New'},
+    'date': {'date_from': '2026-01-01', 'date_to': '2026-12-31'},
+    'price': {'price_min': '10', 'price_max': '100'},
+    'status': {'status': 'cancelled'},
+}
+
+COMBINATIONS = [names for size in range(len(FILTER_GROUPS) + 1)
+                for names in combinations(sorted(FILTER_GROUPS), size)]
+
+
+def plan_stages(node):
+    # Stage names anywhere in an explain plan (classic or SBE layout)
+    stages = []
+    if isinstance(node, dict):
+        if 'stage' in node:
+            stages.append(node['stage'])
+        for value in node.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(node, list):
+        for item in node:
+            stages.extend(plan_stages(item))
+    return stages
+
+
+@pytest.fixture
+def catalog(db):
+    categories = ['Music', 'Tech', 'Food', 'Sports']
+    locations = ['New York', 'Newark', 'Boston', 'Chicago']
+    db.events.insert_many([{
+        'title': f'Event {i} jazz' if i % 7 == 0 else f'Event {i}',
+        'description': 'An event',
+        'date': f'2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}',
+        'location': locations[i % len(locations)],
+        'category': categories[i % len(categories)],
+        'price': i % 150,
+        'status': 'cancelled' if i % 10 == 0 else 'published',
+        'maxAttendees': 100,
+        'registeredCount': 0,
+        'updated_at': datetime.utcnow()
+    } for i in range(500)])
+    return db
+
+
+@pytest.mark.parametrize('names', COMBINATIONS, ids=lambda names: '+'.join(names) or 'none')
+def test_filter_combination_uses_index(app, catalog, names):
+    args = MultiDict()
+    for name in names:
+        for key, value in FILTER_GROUPS[name].items():
+            args.add(key, value)
+
+    query, projection, limit = build_events_list_query(args, 20, 100)
+    plan = page_cursor(catalog.events.find(query, projection), limit).explain()
+
+    stages = plan_stages(plan['queryPlanner']['winningPlan'])
+    assert 'COLLSCAN' not in stages, stages
+    assert 'IXSCAN' in stages, stages
+
+
+@pytest.mark.parametrize('value', ['nan', 'NaN', 'inf', '-Infinity', '1e400'])
+def test_parse_number_rejects_non_finite(value):
+    with pytest.raises(ValueError):
+        parse_number(value, 'price')
+
+
+def test_non_finite_price_filter_is_a_bad_request(client):
+    response = client.get('/api/events?price_min=nan')
+
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'price_min must be a number'
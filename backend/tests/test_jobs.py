@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+import pytest
+from helpers.jobs import JobRunner, job
+
+runs = []
+
+
+@job('test_record')
+def record(payload):
+    runs.append(payload['n'])
+    return payload['n']
+
+
+@job('test_fail')
+def fail(payload):
+    raise RuntimeError('handler failed')
+
+
+@pytest.fixture
+def runner(app, db):
+    runs.clear()
+    return JobRunner(app, db.jobs, workers=0, lease=60, max_attempts=2, retry_backoff=5)
+
+
+def expire(db, job_id, field):
+    db.jobs.update_one({'_id': job_id}, {'$set': {field: datetime.utcnow() - timedelta(seconds=1)}})
+
+
+def test_dedupe_key_queues_one_copy_until_it_finishes(runner, db):
+    first = runner.enqueue('test_record', {'n': 1}, dedupe_key='event:1')
+    second = runner.enqueue('test_record', {'n': 2}, dedupe_key='event:1')
+
+    assert second == first
+    assert db.jobs.count_documents({}) == 1
+
+    assert runner.run_pending() == 1
+    assert runs == [1]
+    # The finished job released its key, so the next change queues a new one
+    third = runner.enqueue('test_record', {'n': 3}, dedupe_key='event:1')
+    assert third != first
+    assert db.jobs.find_one({'_id': first}).get('dedupe_key') is None
+
+
+def test_jobs_without_dedupe_key_are_all_queued(runner, db):
+    runner.enqueue('test_record', {'n': 1})
+    runner.enqueue('test_record', {'n': 2})
+
+    assert runner.run_pending() == 2
+    assert runs == [1, 2]
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(app, runner, db):
+    job_id = runner.enqueue('test_record', {'n': 1})
+    # A worker claims the job and dies before finishing it
+    dead = JobRunner(app, db.jobs, workers=0, lease=60)
+    stale = dead.claim()
+    assert runner.run_next() is False
+
+    expire(db, job_id, 'lease_until')
+    assert runner.run_next() is True
+    assert runs == [1]
+    doc = db.jobs.find_one({'_id': job_id})
+    assert doc['status'] == 'done' and doc['attempts'] == 2
+
+    # The first worker coming back late can't overwrite the finished attempt
+    dead._finish(stale, 'failed', error='late')
+    assert db.jobs.find_one({'_id': job_id})['status'] == 'done'
+
+
+def test_failing_job_is_retried_then_failed(runner, db):
+    job_id = runner.enqueue('test_fail', dedupe_key='cleanup')
+
+    assert runner.run_next() is True
+    doc = db.jobs.find_one({'_id': job_id})
+    assert doc['status'] == 'pending' and doc['run_at'] > datetime.utcnow()
+    assert doc['error'] == 'handler failed'
+    # Not due until its backoff has passed
+    assert runner.run_next() is False
+
+    expire(db, job_id, 'run_at')
+    assert runner.run_next() is True
+    doc = db.jobs.find_one({'_id': job_id})
+    assert doc['status'] == 'failed' and doc['attempts'] == 2
+    assert 'dedupe_key' not in doc
+    assert runner.stats()['retried'] == 1 and runner.stats()['failed'] == 1
+
+
+def test_job_whose_worker_keeps_dying_is_failed(app, runner, db):
+    job_id = runner.enqueue('test_record', {'n': 1})
+    for _ in range(2):
+        assert JobRunner(app, db.jobs, workers=0, lease=60).claim()['_id'] == job_id
+        expire(db, job_id, 'lease_until')
+
+    assert runner.run_next() is True
+    assert runs == []
+    doc = db.jobs.find_one({'_id': job_id})
+    assert doc['status'] == 'failed' and doc['error'] == 'Lease expired too many times'
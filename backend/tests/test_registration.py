@@ -0,0 +1,209 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import pytest
+from flask_jwt_extended import create_access_token
+import indexes
+from app import create_app
+from conftest import TestConfig
+from counters import migrate_events
+from helpers import seat_shards
+
+ATTEMPTS = 2000
+CAPACITY = 100
+
+
+@pytest.mark.parametrize('shards', [0, 8], ids=['counter', 'sharded'])
+def test_parallel_registrations_fill_exactly_capacity(app, db, shards):
+    event_id = db.events.insert_one({
+        'title': 'Ticket rush',
+        'date': '2026-09-01',
+        'status': 'published',
+        'maxAttendees': CAPACITY,
+        'registeredCount': 0,
+        'seatShards': shards,
+        'updated_at': datetime.utcnow()
+    }).inserted_id
+    if shards:
+        seat_shards.configure_shards(event_id, CAPACITY, shards)
+
+    user_ids = db.users.insert_many([
+        {'name': f'Fan {i}', 'email': f'fan{i}@example.com', 'password': 'unused'}
+        for i in range(ATTEMPTS)
+    ]).inserted_ids
+    with app.app_context():
+        tokens = [create_access_token(identity=str(user_id)) for user_id in user_ids]
+
+    def register(token):
+        response = app.test_client().post(f'/api/events/{event_id}/register',
+                                          headers={'Authorization': f'Bearer {token}'})
+        return response.status_code
+
+    with ThreadPoolExecutor(max_workers=64) as pool:
+        statuses = list(pool.map(register, tokens))
+
+    assert statuses.count(201) == CAPACITY
+    assert statuses.count(400) == ATTEMPTS - CAPACITY
+    assert db.registrations.count_documents({'event_id': event_id}) == CAPACITY
+    if shards:
+        assert seat_shards.shard_totals([event_id])[event_id] == CAPACITY
+    else:
+        assert db.events.find_one({'_id': event_id})['registeredCount'] == CAPACITY
+
+
+def test_same_user_registers_once(client, db, make_user):
+    event_id = db.events.insert_one({
+        'title': 'Meetup', 'date': '2026-09-01', 'status': 'published',
+        'maxAttendees': 10, 'registeredCount': 0, 'updated_at': datetime.utcnow()
+    }).inserted_id
+    _, headers = make_user('Repeat Visitor')
+
+    first = client.post(f'/api/events/{event_id}/register', headers=headers)
+    second = client.post(f'/api/events/{event_id}/register', headers=headers)
+
+    assert first.status_code == 201
+    assert second.status_code == 400
+    assert db.events.find_one({'_id': event_id})['registeredCount'] == 1
+
+
+def test_migration_caps_legacy_events(client, db, make_user):
+    # Events created by the old UI: string numbers and no registeredCount
+    event_id = db.events.insert_one({
+        'title': 'Legacy', 'date': '2026-09-01', 'status': 'published',
+        'maxAttendees': '3', 'price': '12.50', 'updated_at': datetime.utcnow()
+    }).inserted_id
+    for _ in range(3):
+        db.registrations.insert_one({'event_id': event_id, 'user_id': make_user()[0]})
+
+    assert migrate_events() == {'cast': 2, 'backfilled': 1}
+    event = db.events.find_one({'_id': event_id})
+    assert event['maxAttendees'] == 3 and event['price'] == 12.5
+    assert event['registeredCount'] == 3
+
+    _, headers = make_user('Late Fan')
+    response = client.post(f'/api/events/{event_id}/register', headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Event is full'
+
+    assert migrate_events() == {'cast': 0, 'backfilled': 0}
+
+
+@pytest.mark.parametrize('field', ['maxAttendees', 'price'])
+def test_non_finite_numbers_are_rejected(client, db, make_user, field):
+    _, headers = make_user('Organizer')
+    response = client.post('/api/events', headers=headers, json={
+        'title': 'Meetup', 'description': 'Monthly meetup', 'date': '2026-09-01',
+        'time': '18:00', 'location': 'Lahore', field: 'nan'
+    })
+
+    assert response.status_code == 400
+    assert db.events.count_documents({}) == 0
+
+
+def test_migration_resets_non_finite_numbers(db):
+    # Stored by builds that let 'nan' and 'inf' through
+    event_id = db.events.insert_one({
+        'title': 'Broken', 'date': '2026-09-01', 'status': 'published', 'registeredCount': 0,
+        'maxAttendees': float('nan'), 'price': ' inf ', 'updated_at': datetime.utcnow()
+    }).inserted_id
+
+    assert migrate_events() == {'cast': 2, 'backfilled': 0}
+    event = db.events.find_one({'_id': event_id})
+    assert event['maxAttendees'] == 100 and event['price'] == 0
+
+
+def test_missing_unique_index_stops_registration(client, db, make_user):
+    event_id = db.events.insert_one({
+        'title': 'Meetup', 'date': '2026-09-01', 'status': 'published',
+        'maxAttendees': 10, 'registeredCount': 0, 'updated_at': datetime.utcnow()
+    }).inserted_id
+    user_id, headers = make_user('Repeat Visitor')
+    db.registrations.drop_index('event_user_unique')
+    indexes._present.clear()
+    try:
+        db.registrations.insert_many([{'event_id': event_id, 'user_id': user_id} for _ in range(2)])
+
+        result = indexes.ensure_indexes()['registrations']
+        assert 'error' in result
+        [duplicate] = result['duplicates']['event_user_unique']
+        assert duplicate['_id'] == {'event_id': event_id, 'user_id': user_id}
+        assert duplicate['count'] == 2
+
+        # The site still starts; only registration is refused, unless
+        # starting is made conditional on the index
+        create_app(TestConfig)
+        strict = type('StrictConfig', (TestConfig,), {'REQUIRE_INDEXES_ON_STARTUP': True})
+        with pytest.raises(RuntimeError, match='registrations.event_user_unique'):
+            create_app(strict)
+        response = client.post(f'/api/events/{event_id}/register', headers=headers)
+        assert response.status_code == 503
+        assert db.events.find_one({'_id': event_id})['registeredCount'] == 0
+    finally:
+        db.registrations.delete_many({})
+        assert 'error' not in indexes.ensure_indexes()['registrations']
+
+
+def test_shrinking_sharded_event_keeps_taken_seats(client, db, make_user):
+    organizer_id, headers = make_user('Organizer')
+    event_id = db.events.insert_one({
+        'title': 'Flash sale', 'date': '2026-09-01', 'status': 'published',
+        'organizer_id': organizer_id, 'maxAttendees': 10, 'seatShards': 4,
+        'updated_at': datetime.utcnow()
+    }).inserted_id
+    seat_shards.configure_shards(event_id, 10, 4, registered=8)
+
+    response = client.put(f'/api/events/{event_id}', headers=headers, json={'maxAttendees': 5})
+    assert response.status_code == 200
+    assert seat_shards.shard_totals([event_id]) == {event_id: 8}
+
+    _, fan = make_user('Fan')
+    response = client.post(f'/api/events/{event_id}/register', headers=fan)
+    assert response.get_json()['message'] == 'Event is full'
+
+
+def test_saving_unchanged_form_keeps_shards(client, db, make_user):
+    organizer_id, headers = make_user('Organizer')
+    event_id = db.events.insert_one({
+        'title': 'Flash sale', 'date': '2026-09-01', 'status': 'published',
+        'organizer_id': organizer_id, 'maxAttendees': 10, 'seatShards': 4,
+        'updated_at': datetime.utcnow()
+    }).inserted_id
+    seat_shards.configure_shards(event_id, 10, 4, registered=3)
+    shards = list(db.seat_shards.find({'event_id': event_id}, {'_id': 1}))
+
+    # The edit form sends every field, as strings, even when only the title changed
+    response = client.put(f'/api/events/{event_id}', headers=headers, json={
+        'title': 'Flash sale (moved)', 'maxAttendees': '10', 'seatShards': '4'
+    })
+    assert response.status_code == 200
+    assert list(db.seat_shards.find({'event_id': event_id}, {'_id': 1})) == shards
+    assert seat_shards.shard_totals([event_id]) == {event_id: 3}
+
+
+@pytest.mark.parametrize('before, after', [(0, 4), (4, 0)], ids=['to-sharded', 'to-counter'])
+def test_cancel_after_switching_flash_sale_mode(client, db, make_user, before, after):
+    organizer_id, organizer = make_user('Organizer')
+    event_id = db.events.insert_one({
+        'title': 'Switching', 'date': '2026-09-01', 'status': 'published',
+        'organizer_id': organizer_id, 'maxAttendees': 10, 'registeredCount': 0,
+        'seatShards': before, 'updated_at': datetime.utcnow()
+    }).inserted_id
+    if before:
+        seat_shards.configure_shards(event_id, 10, before)
+    fans = [make_user(f'Fan {i}')[1] for i in range(2)]
+
+    # One registration made before the switch, one after
+    assert client.post(f'/api/events/{event_id}/register', headers=fans[0]).status_code == 201
+    response = client.put(f'/api/events/{event_id}', headers=organizer, json={'seatShards': after})
+    assert response.status_code == 200
+    assert client.post(f'/api/events/{event_id}/register', headers=fans[1]).status_code == 201
+
+    for headers in fans:
+        assert client.delete(f'/api/events/{event_id}/register', headers=headers).status_code == 200
+
+    assert db.registrations.count_documents({'event_id': event_id}) == 0
+    event = db.events.find_one({'_id': event_id})
+    if after:
+        assert seat_shards.shard_totals([event_id]).get(event_id, 0) == 0
+    else:
+        assert event['registeredCount'] == 0
+        assert db.seat_shards.count_documents({'event_id': event_id}) == 0
@@ -0,0 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
+import pymongo
+from flask_jwt_extended import create_access_token
+from helpers.revocation import RevocationList
+
+
+def test_concurrent_logouts_are_all_revoked(app, client, db, make_user):
+    user_id, headers = make_user('Many Devices')
+    with app.app_context():
+        tokens = [create_access_token(identity=str(user_id)) for _ in range(200)]
+    # Load the revocation list first, so logouts update it in memory
+    assert client.get('/api/auth/profile', headers=headers).status_code == 200
+
+    def logout(token):
+        return app.test_client().post('/api/auth/logout',
+                                      headers={'Authorization': f'Bearer {token}'}).status_code
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        assert set(pool.map(logout, tokens)) == {200}
+
+    for token in tokens:
+        response = client.get('/api/auth/profile', headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == 401
+
+
+def test_first_load_does_not_use_the_request_deadline(app, db):
+    db.revoked_tokens.insert_one({'_id': 'revoked-jti'})
+    revocations = RevocationList(db.revoked_tokens, 1000, 0.001, 60, 3600)
+
+    # A request whose deadline is all but spent still gets a complete list
+    with app.test_request_context(), pymongo.timeout(0.000001):
+        assert revocations.is_revoked('revoked-jti')
+    assert not revocations.is_revoked('other-jti')
@@ -0,0 +1,101 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from helpers.singleflight import SingleFlight
+
+CALLERS = 16
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.001)
+
+
+def run_together(flight, key, fetch):
+    # Start CALLERS threads on one key; each returns its result or exception
+    def call(_):
+        try:
+            return flight.do(key, fetch)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as pool:
+        return list(pool.map(call, range(CALLERS)))
+
+
+def test_concurrent_callers_share_one_fetch():
+    flight = SingleFlight()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        # Hold the fetch open until every other caller is waiting on it
+        wait_for(lambda: flight.stats()['collapsed'] == CALLERS - 1)
+        return {'title': 'Concert'}
+
+    results = run_together(flight, 'event:1', fetch)
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {'in_flight': 0, 'leaders': 1, 'collapsed': CALLERS - 1,
+                              'errors': 0, 'max_waiters': CALLERS - 1}
+
+
+def test_waiters_get_the_leaders_exception():
+    flight = SingleFlight()
+
+    def fetch():
+        wait_for(lambda: flight.stats()['collapsed'] == CALLERS - 1)
+        raise TimeoutError('query timed out')
+
+    results = run_together(flight, 'event:1', fetch)
+
+    assert all(isinstance(result, TimeoutError) for result in results)
+    stats = flight.stats()
+    assert stats['leaders'] == 1 and stats['errors'] == 1 and stats['in_flight'] == 0
+
+
+def test_next_call_after_a_fetch_runs_again():
+    # Nothing is cached: a call after the fetch returned is a new leader
+    flight = SingleFlight()
+    assert flight.do('event:1', lambda: 1) == 1
+    with pytest.raises(ValueError):
+        flight.do('event:1', lambda: int('x'))
+    assert flight.do('event:1', lambda: 2) == 2
+    assert flight.stats()['leaders'] == 3 and flight.stats()['collapsed'] == 0
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return 'slow'
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(flight.do, 'event:1', slow)
+        wait_for(lambda: flight.stats()['in_flight'] == 1)
+        assert flight.do('event:2', lambda: 'fast') == 'fast'
+        release.set()
+        assert pending.result() == 'slow'
+    assert flight.stats()['collapsed'] == 0
+
+
+def test_event_detail_reads_go_through_single_flight(app, client, db, monkeypatch):
+    event_id = db.events.insert_one({'title': 'Meetup', 'status': 'published'}).inserted_id
+
+    def leaders():
+        flight = app.extensions.get('single_flight')
+        return flight.stats()['leaders'] if flight else 0
+
+    before = leaders()
+    assert client.get(f'/api/events/{event_id}').status_code == 200
+    assert leaders() == before + 1
+
+    monkeypatch.setitem(app.config, 'SINGLE_FLIGHT_ENABLED', False)
+    assert client.get(f'/api/events/{event_id}').status_code == 200
+    assert leaders() == before + 1
@@ -0,0 +1,68 @@
+import re
+from datetime import datetime
+from helpers import seat_shards
+
+
+def db_commands(response):
+    # The query tracker reports the request's MongoDB commands in Server-Timing
+    match = re.search(r'db;desc="(\d+) queries"', response.headers['Server-Timing'])
+    return int(match.group(1))
+
+
+def add_events(db, organizer_id, count):
+    for i in range(count):
+        sharded = i % 5 == 0
+        event_id = db.events.insert_one({
+            'title': f'Event {i}',
+            'date': '2026-06-01',
+            'status': 'published',
+            'maxAttendees': 50,
+            'registeredCount': 3,
+            'seatShards': 4 if sharded else 0,
+            'organizer_id': organizer_id,
+            'created_at': datetime.utcnow(),
+            'updated_at': datetime.utcnow()
+        }).inserted_id
+        if sharded:
+            seat_shards.configure_shards(event_id, 50, 4, 3)
+
+
+def test_user_events_command_count_does_not_grow_with_events(client, db, make_user):
+    small_id, small_headers = make_user('Small Organizer')
+    large_id, large_headers = make_user('Large Organizer')
+    # Both listings fit in the server's first batch (101 documents); past
+    # that a getMore per batch is expected, not an extra query per event
+    add_events(db, small_id, 3)
+    add_events(db, large_id, 100)
+
+    # Warm the user cache and revocation list so only the listing is counted
+    client.get('/api/user/events', headers=small_headers)
+    client.get('/api/user/events', headers=large_headers)
+
+    small = client.get('/api/user/events', headers=small_headers)
+    large = client.get('/api/user/events', headers=large_headers)
+
+    assert small.status_code == 200 and large.status_code == 200
+    assert len(large.get_json()['events']) == 100
+    assert all(event['registeredCount'] == 3 for event in large.get_json()['events'])
+    assert db_commands(large) == db_commands(small)
+
+
+def test_user_events_revalidate_after_an_event_is_removed(client, db, make_user):
+    organizer_id, headers = make_user('Organizer')
+    add_events(db, organizer_id, 3)
+
+    first = client.get('/api/user/events', headers=headers)
+    assert 'Last-Modified' not in first.headers
+
+    # Removing the oldest event leaves the newest updated_at where it was
+    oldest = db.events.find_one({'organizer_id': organizer_id}, sort=[('created_at', 1)])
+    db.events.delete_one({'_id': oldest['_id']})
+
+    second = client.get('/api/user/events', headers={
+        **headers,
+        'If-None-Match': first.headers['ETag'],
+        'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'
+    })
+    assert second.status_code == 200
+    assert len(second.get_json()['events']) == 2
@@ -0,0 +1,103 @@
+import time
+from bson.errors import InvalidDocument
+from pymongo.errors import AutoReconnect, BulkWriteError
+from helpers.write_behind import DUPLICATE_KEY, BufferedWriter
+
+
+class FakeCollection:
+    # Stands in for a collection: keeps what insert_many wrote and raises the
+    # queued errors first
+
+    def __init__(self, errors=()):
+        self.docs = []
+        self.calls = 0
+        self.errors = list(errors)
+
+    def insert_many(self, docs, ordered=True):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        if any(doc.get('poison') for doc in docs):
+            raise InvalidDocument('cannot encode object')
+        self.docs.extend(docs)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.005)
+
+
+def test_poison_document_is_dead_lettered_and_others_are_written():
+    contacts, failed = FakeCollection(), FakeCollection()
+    writer = BufferedWriter(contacts, batch_size=10, flush_interval=60, max_attempts=3, dead_letter=failed)
+    for doc in [{'name': 'Ayesha'}, {'name': 'Bilal', 'poison': True}, {'name': 'Sana'}]:
+        assert writer.submit(doc)
+
+    writer.close()
+
+    assert [doc['name'] for doc in contacts.docs] == ['Ayesha', 'Sana']
+    [letter] = failed.docs
+    assert 'Bilal' in letter['document'] and letter['attempts'] == 3
+    assert 'cannot encode' in letter['error']
+    stats = writer.stats()
+    assert stats['written'] == 2 and stats['dead_lettered'] == 1 and stats['pending'] == 0
+
+
+def test_poison_document_does_not_hold_up_later_batches():
+    contacts = FakeCollection()
+    writer = BufferedWriter(contacts, batch_size=1, flush_interval=0.01, max_attempts=2)
+    try:
+        writer.submit({'name': 'Bilal', 'poison': True})
+        for i in range(5):
+            writer.submit({'name': f'Visitor {i}'})
+
+        wait_for(lambda: writer.stats()['written'] == 5)
+        assert writer.stats()['dead_lettered'] == 1
+    finally:
+        writer.close()
+
+
+def test_outage_is_retried_without_counting_attempts():
+    # More transient failures than max_attempts, then MongoDB comes back
+    contacts = FakeCollection([AutoReconnect('connection reset')] * 5)
+    writer = BufferedWriter(contacts, batch_size=1, flush_interval=0.01, max_attempts=2)
+    try:
+        writer.submit({'name': 'Ayesha'})
+
+        wait_for(lambda: writer.stats()['written'] == 1)
+        stats = writer.stats()
+        assert stats['failures'] == 5 and stats['dead_lettered'] == 0
+        assert contacts.docs == [{'name': 'Ayesha'}]
+    finally:
+        writer.close()
+
+
+def test_duplicates_from_a_retried_batch_are_not_retried():
+    # The first document was written before the batch failed; only the
+    # second one failed for a real reason
+    error = BulkWriteError({'writeErrors': [
+        {'index': 0, 'code': DUPLICATE_KEY, 'errmsg': 'duplicate key'},
+        {'index': 1, 'code': 121, 'errmsg': 'document failed validation'}
+    ]})
+    contacts = FakeCollection([error])
+    writer = BufferedWriter(contacts, batch_size=10, flush_interval=60, max_attempts=3)
+    writer.submit({'name': 'Ayesha'})
+    writer.submit({'name': 'Bilal'})
+
+    writer.close()
+
+    assert contacts.docs == [{'name': 'Bilal'}]
+    assert contacts.calls == 2
+    assert writer.stats()['written'] == 2
+
+
+def test_full_buffer_rejects_submissions():
+    writer = BufferedWriter(FakeCollection(), batch_size=10, flush_interval=60, max_pending=2)
+    try:
+        assert writer.submit({'n': 1}) and writer.submit({'n': 2})
+        assert not writer.submit({'n': 3})
+        assert writer.stats()['rejected'] == 1
+    finally:
+        writer.close()
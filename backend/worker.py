@@ -0,0 +1,55 @@
+import argparse
+import json
+import signal
+import threading
+from app import create_app
+from helpers.jobs import JobRunner, HANDLERS, get_job_runner
+from models.collections import jobs_collection
+import tasks  # noqa: F401 - registers the job handlers
+
+# Runs background jobs outside the web workers, e.g. with JOBS_MODE=worker:
+#   python worker.py run --workers 4
+#   python worker.py enqueue reconcile_registration_counts
+
+
+def run(app, workers, once):
+    config = app.config
+    runner = JobRunner(app, jobs_collection, workers, config['JOBS_POLL_INTERVAL'], config['JOBS_LEASE'],
+                       config['JOBS_MAX_ATTEMPTS'], config['JOBS_RETRY_BACKOFF'])
+    if once:
+        print(f"Ran {runner.run_pending()} jobs")
+        return
+
+    # SIGTERM stops claiming new jobs and waits for the running ones
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    runner.start()
+    print(f"Job worker {runner.worker_id} running {workers} threads")
+    try:
+        while not stopping.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    runner.stop()
+    print(f"Stopped: {runner.stats()}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run or queue background jobs')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='process queued jobs')
+    run_parser.add_argument('--workers', type=int, default=2, help='worker threads')
+    run_parser.add_argument('--once', action='store_true', help='run every due job, then exit')
+    enqueue_parser = commands.add_parser('enqueue', help='queue a job')
+    enqueue_parser.add_argument('name', choices=sorted(HANDLERS))
+    enqueue_parser.add_argument('--payload', type=json.loads, default={}, help='JSON payload')
+    enqueue_parser.add_argument('--dedupe-key', help='skip if a job with this key is queued')
+    args = parser.parse_args()
+
+    app = create_app()
+    if args.command == 'run':
+        run(app, args.workers, args.once)
+    else:
+        with app.app_context():
+            job_id = get_job_runner().enqueue(args.name, args.payload, args.dedupe_key)
+        print(f"Queued {args.name}: {job_id}")
@@ -5,36 +5,57 @@ import { eventsAPI } from '../services/api';
 
 const Events = () => {
   const [events, setEvents] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [initialLoad, setInitialLoad] = useState(true);
   const [error, setError] = useState('');
   const [searchTerm, setSearchTerm] = useState('');
   const [selectedCategory, setSelectedCategory] = useState('All');
 
   const categories = ['All', 'Conference', 'Corporate', 'Networking', 'Workshop', 'Social', 'Concert'];
 
+  // Search and category filtering run on the server; debounce typing
   useEffect(() => {
-    fetchEvents();
-  }, []);
+    const timer = setTimeout(fetchEvents, 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm, selectedCategory]);
+
+  const filterParams = () => ({
+    q: searchTerm.trim(),
+    category: selectedCategory === 'All' ? '' : selectedCategory
+  });
 
   const fetchEvents = async () => {
     try {
       setLoading(true);
-      const data = await eventsAPI.getAllEvents();
+      setError('');
+      const data = await eventsAPI.getAllEvents(filterParams());
       setEvents(data.events || data);
+      setNextCursor(data.next_cursor || null);
     } catch (err) {
       setError('Failed to load events');
       console.error('Error fetching events:', err);
     } finally {
       setLoading(false);
+      setInitialLoad(false);
     }
   };
 
-  const filteredEvents = events.filter(event => {
-    const matchesSearch = event.title?.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         event.location?.toLowerCase().includes(searchTerm.toLowerCase());
-    const matchesCategory = selectedCategory === 'All' || event.category === selectedCategory;
-    return matchesSearch && matchesCategory;
-  });
+  const fetchMoreEvents = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const data = await eventsAPI.getAllEvents({ ...filterParams(), after: nextCursor });
+      setEvents(prev => [...prev, ...(data.events || [])]);
+      setNextCursor(data.next_cursor || null);
+    } catch (err) {
+      setError('Failed to load more events');
+      console.error('Error fetching events:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   const formatDate = (dateString) => {
     return new Date(dateString).toLocaleDateString('en-US', {
@@ -44,7 +65,8 @@ const Events = () => {
     });
   };
 
-  if (loading) {
+  // Keep the search box mounted while filtered results reload
+  if (loading && initialLoad) {
     return (
       <div className="min-h-screen bg-gray-50 flex items-center justify-center">
         <div className="text-center">
@@ -106,7 +128,7 @@ const Events = () => {
 
           {/* Results Count */}
           <div className="mt-4 text-gray-600">
-            Showing {filteredEvents.length} event{filteredEvents.length !== 1 ? 's' : ''}
+            Showing {events.length} event{events.length !== 1 ? 's' : ''}
             {selectedCategory !== 'All' && ` in ${selectedCategory}`}
             {searchTerm && ` matching "${searchTerm}"`}
           </div>
@@ -129,7 +151,7 @@ const Events = () => {
           )}
 
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8">
-            {filteredEvents.map((event) => (
+            {events.map((event) => (
               <div 
                 key={event._id || event.id} 
                 className={`bg-white rounded-xl shadow-lg overflow-hidden hover:shadow-xl transition-all duration-300 hover:scale-105 group ${
@@ -160,9 +182,6 @@ const Events = () => {
                   <h3 className="text-xl font-semibold text-gray-900 mb-2 group-hover:text-blue-600 transition-colors duration-200">
                     {event.title}
                   </h3>
-                  <p className="text-gray-600 mb-4 text-sm leading-relaxed">
-                    {event.description}
-                  </p>
                   
                   <div className="space-y-2 text-gray-600 text-sm mb-4">
                     <div className="flex items-center">
@@ -191,7 +210,19 @@ const Events = () => {
             ))}
           </div>
 
-          {filteredEvents.length === 0 && !loading && (
+          {nextCursor && (
+            <div className="text-center mt-12">
+              <button
+                onClick={fetchMoreEvents}
+                disabled={loadingMore}
+                className="bg-white border border-blue-600 text-blue-600 px-6 py-3 rounded-lg font-medium hover:bg-blue-50 transition-colors duration-200 disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'Load More Events'}
+              </button>
+            </div>
+          )}
+
+          {events.length === 0 && !loading && (
             <div className="text-center py-12">
               <div className="text-gray-400 text-lg mb-4">No events found</div>
               <p className="text-gray-600">
@@ -13,13 +13,10 @@ const Home = () => {
 
   const fetchUpcomingEvents = async () => {
     try {
-      const data = await eventsAPI.getAllEvents();
-      const events = data.events || data;
-      // Get upcoming events (future dates) and limit to 3
-      const upcoming = events
-        .filter(event => new Date(event.date) > new Date())
-        .slice(0, 3);
-      setUpcomingEvents(upcoming);
+      // Ask the server for the next 3 upcoming events only
+      const today = new Date().toISOString().slice(0, 10);
+      const data = await eventsAPI.getAllEvents({ date_from: today, limit: 3 });
+      setUpcomingEvents(data.events || data);
     } catch (error) {
       console.error('Error fetching events:', error);
       // Use fallback data if API fails
@@ -9,6 +9,18 @@ const handleResponse = async (response) => {
   return response.json();
 };
 
+// Helper function to build a query string, skipping empty values
+const buildQuery = (params = {}) => {
+  const query = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== '') {
+      query.append(key, value);
+    }
+  });
+  const queryString = query.toString();
+  return queryString ? `?${queryString}` : '';
+};
+
 // Helper function to get auth headers
 const getAuthHeaders = () => {
   const token = localStorage.getItem('token');
@@ -56,8 +68,9 @@ export const authAPI = {
 
 // Events API calls
 export const eventsAPI = {
-  getAllEvents: async () => {
-    const response = await fetch(`${API_BASE_URL}/api/events`);
+  // Returns one page: { events, next_cursor }. Pass next_cursor as `after` to get the next page.
+  getAllEvents: async (params = {}) => {
+    const response = await fetch(`${API_BASE_URL}/api/events${buildQuery(params)}`);
     return handleResponse(response);
   },
 
@@ -92,9 +105,42 @@ export const eventsAPI = {
     return handleResponse(response);
   },
 
+  // During registration bursts the server answers 202 with a queue ticket;
+  // wait until the ticket is admitted, then retry with it
   registerForEvent: async (eventId) => {
+    let ticket = null;
+    for (;;) {
+      const response = await fetch(`${API_BASE_URL}/api/events/${eventId}/register`, {
+        method: 'POST',
+        headers: {
+          ...getAuthHeaders(),
+          ...(ticket && { 'X-Queue-Ticket': ticket })
+        }
+      });
+      if (response.status !== 202) {
+        return handleResponse(response);
+      }
+
+      const queued = await response.json();
+      ticket = queued.ticket;
+      let admitted = false;
+      while (!admitted) {
+        const retryAfter = Number(response.headers.get('Retry-After')) || 1;
+        await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
+        if (!ticket) break;
+        const status = await fetch(`${API_BASE_URL}/api/queue/${ticket}`);
+        if (!status.ok) {
+          ticket = null;
+          break;
+        }
+        admitted = (await status.json()).admitted;
+      }
+    }
+  },
+
+  cancelRegistration: async (eventId) => {
     const response = await fetch(`${API_BASE_URL}/api/events/${eventId}/register`, {
-      method: 'POST',
+      method: 'DELETE',
       headers: getAuthHeaders()
     });
     return handleResponse(response);